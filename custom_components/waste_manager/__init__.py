@@ -3,47 +3,89 @@ from __future__ import annotations
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
 from homeassistant.components.http import StaticPathConfig
-from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 import datetime
 import logging
-from .const import DOMAIN, CONF_NOTIFY_SERVICE, CONF_NOTIFY_TIME, CONF_ACTION_ENTITY
+from .const import (
+    DOMAIN,
+    CONF_NOTIFY_SERVICE,
+    CONF_ACTION_ENTITY,
+    CONF_WASTE_TYPES,
+    CONF_REMINDERS,
+    CONFIG_VERSION,
+    EVENT_ACTION_MARK_COLLECTED,
+    SIGNAL_CONFIG_UPDATED,
+)
+from .compiled_cache import (
+    async_load_compiled,
+    async_remove_compiled,
+    async_save_compiled,
+)
+from .collection_stats import CollectionStatistics, async_remove_statistics
+from .labels import async_get_labels
+from .notifier import NotifyStats, as_list, async_dispatch
+from .schedule import (
+    SchedulePool,
+    TypeRegistry,
+    WasteSchedule,
+    migrate_config,
+    migrate_reminders,
+)
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.CALENDAR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Waste Manager services."""
+    async_setup_services(hass)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Waste Manager from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    # Compiled schedule shared by all platforms (and by every entry with the
+    # same schedule), replaced on options changes; names, icons and colors
+    # of the types are the entry's own
+    config = entry.options if entry.options else entry.data
+    entry_data = hass.data[DOMAIN].setdefault(entry.entry_id, {})
+    entry_data["config"] = dict(config)
+    entry_data["types"] = TypeRegistry(config.get(CONF_WASTE_TYPES) or {})
+    entry_data["labels"] = await async_get_labels(hass)
+    entry_data["schedule"] = await async_acquire_schedule(hass, entry.entry_id, config)
+
+    forwarded = False
     try:
-        # Register static paths
-        path_www = hass.config.path("custom_components/waste_manager/www")
-        path_rifiuti = hass.config.path("custom_components/waste_manager/rifiuti")
-        _LOGGER.info("Waste Manager registering static paths: %s -> %s", "/local/waste_manager", path_www)
-        
-        await hass.http.async_register_static_paths([
-            StaticPathConfig(
-                "/local/waste_manager",
-                path_www,
-                cache_headers=False,
-            ),
-            StaticPathConfig(
-                "/local/waste_manager/rifiuti",
-                path_rifiuti,
-                cache_headers=False,
-            )
-        ])
-        
+        await async_register_static_paths(hass)
+
+        await async_migrate_unique_ids(hass, entry)
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        forwarded = True
+
+        # Long-term statistics of scheduled and collected pickups
+        entry_data["collection_stats"] = CollectionStatistics(hass, entry.entry_id, entry_data)
+        await entry_data["collection_stats"].async_setup()
         
         # Setup Notification Scheduler
         await async_setup_scheduler(hass, entry)
         
     except Exception as e:
         _LOGGER.exception("Error setting up Waste Manager integration: %s", e)
+        if forwarded:
+            await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+        async_cleanup_entry(hass, entry_data)
+        hass.data[DOMAIN].pop(entry.entry_id, None)
         return False
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
@@ -52,166 +94,299 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 _LOGGER = logging.getLogger(__name__)
 
+# Options that need the notification scheduler to be set up again
+SCHEDULER_KEYS = (CONF_NOTIFY_SERVICE, CONF_REMINDERS)
+
+
+async def async_acquire_schedule(
+    hass: HomeAssistant, entry_id: str, config
+) -> WasteSchedule:
+    """Return the shared compiled schedule of a config from the pool.
+
+    A schedule new to the pool is loaded from the entry's compiled cache,
+    or compiled (and cached) if the cache is missing or stale.
+    """
+    pool = hass.data[DOMAIN].get("schedule_pool")
+    if pool is None:
+        pool = hass.data[DOMAIN]["schedule_pool"] = SchedulePool()
+
+    if "unsub_midnight" not in hass.data[DOMAIN]:
+        async def roll(_now):
+            """Move the shared windows forward, once, after local midnight."""
+            del hass.data[DOMAIN]["unsub_midnight"]
+            arm()
+            rolled = pool.roll(dt_util.now().date())
+            for entry_id, entry_data in list(hass.data[DOMAIN].items()):
+                if isinstance(entry_data, dict) and entry_data.get("schedule") in rolled:
+                    await async_save_compiled(hass, entry_id, entry_data["schedule"])
+
+        @callback
+        def arm():
+            tomorrow = dt_util.now().date() + datetime.timedelta(days=1)
+            hass.data[DOMAIN]["unsub_midnight"] = async_track_point_in_time(
+                hass, roll, dt_util.start_of_local_day(tomorrow)
+            )
+
+        arm()
+
+    schedule = pool.acquire(config)
+    today = dt_util.now().date()
+    if schedule.needs_compile(today):
+        loaded = await async_load_compiled(hass, entry_id, schedule)
+        if not loaded or schedule.needs_compile(today):
+            schedule.compile(today)
+            await async_save_compiled(hass, entry_id, schedule)
+    return schedule
+
+
+@callback
+def release_schedule(hass: HomeAssistant, schedule: WasteSchedule) -> None:
+    """Release a shared schedule, stopping the midnight check if unused."""
+    pool = hass.data[DOMAIN].get("schedule_pool")
+    if pool is None:
+        return
+    pool.release(schedule)
+    if not len(pool) and "unsub_midnight" in hass.data[DOMAIN]:
+        hass.data[DOMAIN].pop("unsub_midnight")()
+
+
+@callback
+def async_cleanup_entry(hass: HomeAssistant, entry_data: dict) -> None:
+    """Cancel an entry's timers and release its shared schedule."""
+    for key in ("unsub_scheduler", "unsub_action"):
+        if key in entry_data:
+            entry_data.pop(key)()
+
+    if "collection_stats" in entry_data:
+        entry_data["collection_stats"].async_shutdown()
+
+    if "schedule" in entry_data:
+        release_schedule(hass, entry_data.pop("schedule"))
+
+
+async def async_migrate_unique_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Scope the unique IDs of an entry's entities to the entry.
+
+    They used to be ``waste_manager_<suffix>``, so a second entry's
+    entities clashed with the first one's.
+    """
+    prefix = f"{DOMAIN}_"
+
+    @callback
+    def update_unique_id(entity_entry: er.RegistryEntry) -> dict[str, str] | None:
+        if not entity_entry.unique_id.startswith(prefix):
+            return None
+        suffix = entity_entry.unique_id[len(prefix):]
+        return {"new_unique_id": f"{entry.entry_id}_{suffix}"}
+
+    await er.async_migrate_entries(hass, entry.entry_id, update_unique_id)
+
+
+async def async_register_static_paths(hass: HomeAssistant) -> None:
+    """Register the card and image paths, once per Home Assistant run."""
+    if hass.data[DOMAIN].get("static_paths_registered"):
+        return
+
+    # Register static paths
+    path_www = hass.config.path("custom_components/waste_manager/www")
+    path_rifiuti = hass.config.path("custom_components/waste_manager/rifiuti")
+    _LOGGER.info("Waste Manager registering static paths: %s -> %s", "/local/waste_manager", path_www)
+    
+    await hass.http.async_register_static_paths([
+        StaticPathConfig(
+            "/local/waste_manager",
+            path_www,
+            cache_headers=False,
+        ),
+        StaticPathConfig(
+            "/local/waste_manager/rifiuti",
+            path_rifiuti,
+            cache_headers=False,
+        )
+    ])
+    hass.data[DOMAIN]["static_paths_registered"] = True
+
+
 async def async_setup_scheduler(hass, entry):
     """Setup the notification scheduler."""
-    # Cancel existing listener if any
-    if "unsub_scheduler" in hass.data[DOMAIN].get(entry.entry_id, {}):
-         hass.data[DOMAIN][entry.entry_id]["unsub_scheduler"]()
-    
-    config = entry.options if entry.options else entry.data
-    notify_service = config.get(CONF_NOTIFY_SERVICE)
-    notify_time = config.get(CONF_NOTIFY_TIME)
+    entry_data = hass.data[DOMAIN].setdefault(entry.entry_id, {})
 
-    if not notify_service or not notify_time:
-        return
+    # Cancel existing listeners if any
+    entry_data.pop("arm_reminder", None)
+    for key in ("unsub_scheduler", "unsub_action"):
+        if key in entry_data:
+            entry_data.pop(key)()
 
-    try:
-        hour, minute = map(int, notify_time.split(":"))
-    except ValueError:
-        _LOGGER.error("Invalid notification time format: %s", notify_time)
+    stats = entry_data.setdefault("notify_stats", NotifyStats())
+
+    config = entry_data["config"]
+    notify_services = as_list(config.get(CONF_NOTIFY_SERVICE))
+    reminders = config.get(CONF_REMINDERS) or []
+
+    if not notify_services or not reminders:
         return
 
-    async def check_and_notify(now):
-        _LOGGER.debug("Waste Manager: Checking for notifications...")
-        
-        from homeassistant.util import dt as dt_util
-        today = dt_util.now().date()
-        
-        # Simplified Check Logic
-        # If notify_time is evening (> 12:00), we warn about TOMORROW's pickup.
-        # If notify_time is morning (< 12:00), we warn about TODAY's pickup.
-        
-        target_date = today
-        prefix = "Oggi"
-        if hour >= 12:
-            target_date = today + datetime.timedelta(days=1)
-            prefix = "Domani"
+    # Scoped to the entry, so a tap only counts for the entry that sent it
+    mark_collected = f"{EVENT_ACTION_MARK_COLLECTED}_{entry.entry_id}"
+
+    async def send_reminder(target_date, days_before):
+        _LOGGER.debug("Waste Manager: Sending reminder for %s", target_date)
+        labels = entry_data["labels"]
             
-        target_weekday = target_date.weekday()
-        
-        # Map weekday to config key
-        week_schedule_keys = [
-            "monday", "tuesday", "wednesday", "thursday", 
-            "friday", "saturday", "sunday"
-        ]
-        key = week_schedule_keys[target_weekday]
-        
-        waste_type = config.get(key)
+        type_ids = entry_data["schedule"].types_on(target_date)
+        waste_type = ", ".join(entry_data["types"].names(type_ids))
         
         if waste_type:
-            message = f"{prefix} ritiro: {waste_type}. Ricordati di esporre i rifiuti!"
-            try:
-                if notify_service:
-                    service_name = notify_service.replace("notify.", "")
-                    
-                    data = {
-                        "message": message, 
-                        "title": "Gestione Rifiuti",
-                        "data": {
-                            "actions": [
-                                {
-                                    "action": "MARK_COLLECTED",
-                                    "title": "✅ Segna come Fatto",
-                                    "activationMode": "background",
-                                    "authenticationRequired": False
-                                }
-                            ],
-                            # iOS Specifics
-                            "push": {
-                                "category": "WASTE_COLLECTION"
-                            }
+            message = labels.notify_message.format(
+                when=labels.days(days_before), types=waste_type
+            )
+            data = {
+                "message": message, 
+                "title": labels.notify_title,
+                "data": {
+                    "actions": [
+                        {
+                            "action": mark_collected,
+                            "title": labels.notify_action,
+                            "activationMode": "background",
+                            "authenticationRequired": False
                         }
+                    ],
+                    # iOS Specifics
+                    "push": {
+                        "category": "WASTE_COLLECTION"
                     }
-                    
-                    await hass.services.async_call(
-                        "notify", 
-                        service_name, 
-                        data
-                    )
-            except Exception as e:
-                _LOGGER.error("Failed to send notification: %s", e)
-
-            # Execute Action (Turn On)
-            action_entities = config.get(CONF_ACTION_ENTITY)
+                }
+            }
+
+            # Kept across restarts for a later tap on the notification
+            if collection_stats := entry_data.get("collection_stats"):
+                await collection_stats.async_set_reminded(target_date)
+
+            # Notify every target and run every action concurrently
+            action_entities = as_list(entry_data["config"].get(CONF_ACTION_ENTITY))
             if action_entities:
-                if isinstance(action_entities, str):
-                    action_entities = [action_entities]
-                
                 _LOGGER.info("Executing Waste Action: Turning on %s", action_entities)
-                try:
-                    await hass.services.async_call(
-                        "homeassistant",
-                        "turn_on",
-                        {"entity_id": action_entities}
-                    )
-                except Exception as e:
-                    _LOGGER.error("Failed to execute action: %s", e)
-
-
-    # Register listener
-    unsub = async_track_time_change(hass, check_and_notify, hour=hour, minute=minute, second=0)
-    
-    # Store unsub to cancel later
-    if entry.entry_id not in hass.data[DOMAIN]:
-         hass.data[DOMAIN][entry.entry_id] = {}
-    hass.data[DOMAIN][entry.entry_id]["unsub_scheduler"] = unsub
+            await async_dispatch(
+                hass, stats, notify_services, action_entities, data
+            )
+
+
+    @callback
+    def arm_reminder():
+        """Arm a timer for the next reminder of the compiled schedule."""
+        if "unsub_scheduler" in entry_data:
+            entry_data.pop("unsub_scheduler")()
+
+        now = dt_util.now()
+        upcoming = entry_data["schedule"].next_reminder(reminders, now, now.tzinfo)
+        if upcoming is None:
+            _LOGGER.debug("Waste Manager: No pickup to remind about")
+            return
+        fire_at, due = upcoming
+
+        async def fire(_now):
+            entry_data.pop("unsub_scheduler", None)
+            try:
+                for target_date, days_before in due:
+                    await send_reminder(target_date, days_before)
+            finally:
+                # A failed reminder must not stop the following ones (unless
+                # the scheduler was set up again meanwhile)
+                if entry_data.get("arm_reminder") is arm_reminder:
+                    arm_reminder()
+
+        _LOGGER.debug("Waste Manager: Next reminder at %s", fire_at)
+        # Store unsub to cancel later
+        entry_data["unsub_scheduler"] = async_track_point_in_time(hass, fire, fire_at)
+
+    entry_data["arm_reminder"] = arm_reminder
+    arm_reminder()
 
     # Listen for Action Events (Global listener, but fine)
     async def handle_notification_action(event):
-        if event.data.get("action") == "MARK_COLLECTED":
+        if event.data.get("action") == mark_collected:
             _LOGGER.info("Received MARK_COLLECTED action from notification")
-            # We don't know the exact entity ID easily here unless we search
-            # But we can assume the user has configured one main waste sensor.
-            # Best effort: Find all waste_manager sensors and call service on them.
-            
-            # Find entities
-            entity_registry = hass.helpers.entity_registry.async_get(hass)
-            waste_entities = []
-            
-            # This is a bit advanced because we need to find entities by platform
-            # Easier: Just loop all states and check entity_id prefix?
-            
-            # Or assume standard ID if not customized. 
-            # Better: Call service set_collected without entity_id? No, service requires it.
-            
-            # Let's find entity ID from config entry if possible
-            # entry.entry_id is known.
-            
-            # We can get entity_id from entity_registry using config_entry_id
-            entities = [
-                entry.entity_id 
-                for entry in entity_registry.entities.values() 
-                if entry.config_entry_id == entry.entry_id
-            ]
-            
-            if entities:
-                await hass.services.async_call(
-                    DOMAIN, "set_collected", {"entity_id": entities}
-                )
-
-    # We should register this listener only once.
-    # But async_setup_scheduler runs per entry.
-    # If we have multiple instances, we might duplicate listeners.
-    # Better to put the event listener in async_setup_entry?
-    # Or just check if registered.
-    
-    # Simple workaround: Just register it. HA allows multiple listeners.
-    hass.bus.async_listen("mobile_app_notification_action", handle_notification_action)
+            # Count the pickup this entry last reminded about as collected
+            if collection_stats := entry_data.get("collection_stats"):
+                await collection_stats.async_mark_reminded_collected()
+
+    entry_data["unsub_action"] = hass.bus.async_listen(
+        "mobile_app_notification_action", handle_notification_action
+    )
+
+
+
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an old config entry."""
+    _LOGGER.debug("Migrating Waste Manager entry from version %s", entry.version)
+
+    if entry.version > CONFIG_VERSION:
+        # Downgraded from a future version
+        return False
+
+    if entry.version == 1:
+        # Raw strings -> structured schedule, exceptions and type registry
+        data = migrate_config(entry.data)
+        options = migrate_config(entry.options) if entry.options else {}
+        hass.config_entries.async_update_entry(
+            entry, data=data, options=options, version=2
+        )
+
+    if entry.version == 2:
+        # Single notify time -> reminders with explicit lead times
+        data = migrate_reminders(entry.data)
+        options = migrate_reminders(entry.options) if entry.options else {}
+        hass.config_entries.async_update_entry(
+            entry, data=data, options=options, version=3
+        )
 
+    _LOGGER.info("Migrated Waste Manager entry to version %s", entry.version)
+    return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    # Cancel scheduler
-    if entry.entry_id in hass.data[DOMAIN] and "unsub_scheduler" in hass.data[DOMAIN][entry.entry_id]:
-        hass.data[DOMAIN][entry.entry_id]["unsub_scheduler"]()
-
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        pass
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id, {})
+        async_cleanup_entry(hass, entry_data)
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored files of a deleted entry."""
+    await async_remove_statistics(hass, entry.entry_id)
+    await async_remove_compiled(hass, entry.entry_id)
+
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Handle options update.
+
+    Applied as a delta instead of a reload: the compiled schedule is
+    replaced, the platforms add/remove/refresh their entities on
+    SIGNAL_CONFIG_UPDATED and the scheduler is only set up again when its
+    time or targets changed.
+    """
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    if entry_data is None:
+        return
+    old_config = entry_data["config"]
+    config = dict(entry.options if entry.options else entry.data)
+    if config == old_config:
+        # Already applied, e.g. a calendar edit being persisted
+        return
+
+    entry_data["config"] = config
+    entry_data["types"] = TypeRegistry(config.get(CONF_WASTE_TYPES) or {})
+    old_schedule = entry_data["schedule"]
+    entry_data["schedule"] = await async_acquire_schedule(hass, entry.entry_id, config)
+    release_schedule(hass, old_schedule)
+
+    if any(old_config.get(key) != config.get(key) for key in SCHEDULER_KEYS):
+        await async_setup_scheduler(hass, entry)
+    elif "arm_reminder" in entry_data:
+        # The next pickup may have moved
+        entry_data["arm_reminder"]()
+
+    async_dispatcher_send(hass, SIGNAL_CONFIG_UPDATED.format(entry.entry_id))
@@ -3,25 +3,42 @@ from __future__ import annotations
 
 import datetime
 from datetime import timedelta
-import re
 
-from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from typing import Any
+
+from homeassistant.components.calendar import (
+    EVENT_START,
+    EVENT_SUMMARY,
+    CalendarEntity,
+    CalendarEntityFeature,
+    CalendarEvent,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.util import dt as dt_util
 
+from .compiled_cache import async_save_compiled
 from .const import (
     DOMAIN,
-    CONF_MONDAY,
-    CONF_TUESDAY,
-    CONF_WEDNESDAY,
-    CONF_THURSDAY,
-    CONF_FRIDAY,
-    CONF_SATURDAY,
-    CONF_SUNDAY,
     CONF_EXCEPTIONS,
+    CONF_WASTE_TYPES,
+    SIGNAL_CONFIG_UPDATED,
 )
+from .schedule import (
+    TypeRegistry,
+    build_types,
+    parse_type_list,
+    schedule_key,
+    set_exception_record,
+)
+
+# Seconds to wait for more edits before saving them to the config entry
+PERSIST_DELAY = 10
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -29,7 +46,8 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the calendar platform."""
-    async_add_entities([WasteManagerCalendar(config_entry)])
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities([WasteManagerCalendar(config_entry, entry_data)])
 
 
 class WasteManagerCalendar(CalendarEntity):
@@ -37,92 +55,190 @@ class WasteManagerCalendar(CalendarEntity):
 
     _attr_has_entity_name = True
     _attr_name = "Calendario Rifiuti"
-    _attr_unique_id = "waste_manager_calendar"
+    _attr_supported_features = (
+        CalendarEntityFeature.CREATE_EVENT
+        | CalendarEntityFeature.DELETE_EVENT
+        | CalendarEntityFeature.UPDATE_EVENT
+    )
 
-    def __init__(self, config_entry: ConfigEntry) -> None:
+    def __init__(self, config_entry: ConfigEntry, entry_data: dict) -> None:
         """Initialize the calendar."""
         self._config_entry = config_entry
+        self._entry_data = entry_data
+        self._attr_unique_id = f"{config_entry.entry_id}_calendar"
         self._event = None
+        self._unsub_persist = None
 
     @property
     def event(self) -> CalendarEvent | None:
         """Return the next upcoming event."""
         return self._event
 
+    async def async_added_to_hass(self) -> None:
+        """Save pending edits when Home Assistant stops.
+
+        ``async_will_remove_from_hass`` is not called on a normal stop. The
+        options flow saves them too before showing the current options.
+        """
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.hass.bus.async_listen(EVENT_HOMEASSISTANT_STOP, self._async_flush)
+        )
+        self._entry_data["flush_edits"] = self._async_flush
+
     async def async_get_events(
         self, hass: HomeAssistant, start_date: datetime.datetime, end_date: datetime.datetime
     ) -> list[CalendarEvent]:
         """Return calendar events within a datetime range."""
         events = []
         
-        config = self._config_entry.options if self._config_entry.options else self._config_entry.data
-        
-        # Schedule Map
-        week_schedule = {
-            0: config.get(CONF_MONDAY),
-            1: config.get(CONF_TUESDAY),
-            2: config.get(CONF_WEDNESDAY),
-            3: config.get(CONF_THURSDAY),
-            4: config.get(CONF_FRIDAY),
-            5: config.get(CONF_SATURDAY),
-            6: config.get(CONF_SUNDAY),
-        }
-        
-        # Parse Exceptions
-        # Format "DD/MM: Type"
-        exceptions_map = {}
-        exceptions_text = config.get(CONF_EXCEPTIONS, "")
-        if exceptions_text:
-            lines = exceptions_text.splitlines()
-            for line in lines:
-                if ":" in line:
-                    date_part, value = line.split(":", 1)
-                    date_part = date_part.strip()
-                    value = value.strip()
-                    
-                    # Try DD/MM
-                    try:
-                        d, m = map(int, date_part.split("/"))
-                        exceptions_map[(d, m)] = value
-                    except ValueError:
-                        pass
-
-        current_date = start_date.date()
-        end_date_date = end_date.date()
-        
-        while current_date <= end_date_date:
-            waste_type = None
+        # Always the current compiled schedule, even after an options change
+        schedule = self._entry_data["schedule"]
+        registry = self._entry_data["types"]
+        labels = self._entry_data["labels"]
+
+        # Only pickup days, found through the compiled next-pickup index
+        for current_date, slot in schedule.iter_pickups(start_date.date(), end_date.date()):
+            types = registry.names(schedule.slots[slot])
+
+            # Create an event for each type or combined?
+            # Combined is cleaner for calendar view usually, but separate events allow distinct colors if supported?
+            # HA Calendar usually distinct events.
+            
+            summary = labels.event_summary.format(types=", ".join(types))
             
-            # Check Exception
-            if (current_date.day, current_date.month) in exceptions_map:
-                waste_type = exceptions_map[(current_date.day, current_date.month)]
-                if waste_type.lower() == "nessuno":
-                    waste_type = None
-            else:
-                # Check Schedule
-                weekday = current_date.weekday()
-                waste_type = week_schedule.get(weekday)
-
-            if waste_type:
-                # Handle multiple types
-                types = [t.strip() for t in waste_type.split(",") if t.strip()]
-                
-                # Create an event for each type or combined?
-                # Combined is cleaner for calendar view usually, but separate events allow distinct colors if supported?
-                # HA Calendar usually distinct events.
-                
-                summary = f"Ritiro: {', '.join(types)}"
-                
-                events.append(
-                    CalendarEvent(
-                        summary=summary,
-                        start=current_date,
-                        end=current_date + timedelta(days=1),
-                        description=f"Raccolta {waste_type}",
-                        location=""
-                    )
+            events.append(
+                CalendarEvent(
+                    summary=summary,
+                    start=current_date,
+                    uid=current_date.isoformat(),
+                    end=current_date + timedelta(days=1),
+                    description=labels.event_description.format(types=", ".join(types)),
+                    location=""
                 )
-
-            current_date += timedelta(days=1)
+            )
 
         return events
+
+    async def async_create_event(self, **kwargs: Any) -> None:
+        """Add the waste types of an event to its day."""
+        day = _event_date(kwargs[EVENT_START])
+        schedule = self._entry_data["schedule"]
+        ids, names = self._parse_summary(kwargs.get(EVENT_SUMMARY))
+        current = list(schedule.types_on(day))
+        await self._async_set_day(day, current + [t for t in ids if t not in current], names)
+
+    async def async_delete_event(
+        self,
+        uid: str,
+        recurrence_id: str | None = None,
+        recurrence_range: str | None = None,
+    ) -> None:
+        """Skip the pickup of an event's day."""
+        await self._async_set_day(_uid_date(uid), [], {})
+
+    async def async_update_event(
+        self,
+        uid: str,
+        event: dict[str, Any],
+        recurrence_id: str | None = None,
+        recurrence_range: str | None = None,
+    ) -> None:
+        """Move an event and/or change its waste types."""
+        old_day = _uid_date(uid)
+        day = _event_date(event[EVENT_START])
+        ids, names = self._parse_summary(event.get(EVENT_SUMMARY))
+        if day != old_day:
+            await self._async_set_day(old_day, [], {})
+        await self._async_set_day(day, ids, names)
+
+    def _parse_summary(self, summary: str | None) -> tuple[list[str], dict[str, str]]:
+        """Return the waste type IDs and names of an event summary."""
+        summary = (summary or "").strip()
+        prefix, _, suffix = self._entry_data["labels"].event_summary.partition("{types}")
+        if prefix and summary.startswith(prefix.strip()):
+            summary = summary[len(prefix.strip()):]
+        if suffix.strip() and summary.endswith(suffix.strip()):
+            summary = summary[:-len(suffix.strip())]
+
+        names: dict[str, str] = {}
+        ids = parse_type_list(summary, names)
+        if not ids:
+            raise HomeAssistantError("The event summary must name the waste types")
+        return ids, names
+
+    async def _async_set_day(
+        self, day: datetime.date, ids: list[str], names: dict[str, str]
+    ) -> None:
+        """Apply a dated exception incrementally and persist it later."""
+        hass = self.hass
+        entry_data = self._entry_data
+        config = dict(entry_data["config"])
+
+        types = dict(config.get(CONF_WASTE_TYPES) or {})
+        new_types = build_types({t: n for t, n in names.items() if t not in types})
+        types.update(new_types)
+        config[CONF_WASTE_TYPES] = types
+        config[CONF_EXCEPTIONS] = set_exception_record(
+            config.get(CONF_EXCEPTIONS) or [], day, ids
+        )
+
+        # Edit a schedule used by this entry only
+        pool = hass.data[DOMAIN]["schedule_pool"]
+        schedule, apply = pool.detach(entry_data["schedule"], schedule_key(config))
+        if apply:
+            for type_id in new_types:
+                schedule.add_type(type_id)
+            schedule.set_exception(day, ids)
+
+        entry_data["config"] = config
+        entry_data["types"] = TypeRegistry(types)
+        entry_data["schedule"] = schedule
+        if "arm_reminder" in entry_data:
+            entry_data["arm_reminder"]()
+        async_dispatcher_send(hass, SIGNAL_CONFIG_UPDATED.format(self._config_entry.entry_id))
+        self.async_write_ha_state()
+
+        # Debounced save
+        if self._unsub_persist:
+            self._unsub_persist()
+        self._unsub_persist = async_call_later(hass, PERSIST_DELAY, self._async_persist)
+
+    async def _async_persist(self, _now=None) -> None:
+        """Save the edited schedule to the config entry and compiled cache."""
+        self._unsub_persist = None
+        entry_data = self._entry_data
+        self.hass.config_entries.async_update_entry(
+            self._config_entry, options=entry_data["config"]
+        )
+        # Numbered unlike a fresh build; the cache keeps the slot table
+        await async_save_compiled(
+            self.hass, self._config_entry.entry_id, entry_data["schedule"]
+        )
+
+    async def _async_flush(self, _event: Event | None = None) -> None:
+        """Save pending edits right away."""
+        if self._unsub_persist:
+            self._unsub_persist()
+            await self._async_persist()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Save pending edits before the entity goes away."""
+        self._entry_data.pop("flush_edits", None)
+        await self._async_flush()
+        await super().async_will_remove_from_hass()
+
+
+def _event_date(value: datetime.date | datetime.datetime) -> datetime.date:
+    """Return the (local) day of an event start."""
+    if isinstance(value, datetime.datetime):
+        return dt_util.as_local(value).date()
+    return value
+
+
+def _uid_date(uid: str) -> datetime.date:
+    """Return the day of an event UID."""
+    try:
+        return datetime.date.fromisoformat(uid)
+    except ValueError as e:
+        raise HomeAssistantError(f"Unknown event: {uid}") from e
@@ -0,0 +1,188 @@
+"""Long-term statistics of waste collections.
+
+Every waste type of a config entry gets two external statistics with a
+running sum: ``waste_manager:<entry>_<type>_scheduled`` counts the pickups
+of the schedule and ``waste_manager:<entry>_<type>_collected`` the pickups
+marked as collected from a notification. One row is written in the first
+whole hour bucket of each pickup day, and only days not imported yet are
+added, so dashboards query the small pre-aggregated statistics tables
+instead of state history.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+KIND_SCHEDULED = "scheduled"
+KIND_COLLECTED = "collected"
+KIND_NAMES = {
+    KIND_SCHEDULED: "ritiri programmati",
+    KIND_COLLECTED: "ritiri effettuati",
+}
+
+
+def statistic_id(entry_id: str, type_id: str, kind: str) -> str:
+    """Return the external statistic ID of a waste type of an entry."""
+    return f"{DOMAIN}:{slugify(entry_id)}_{slugify(type_id)}_{kind}"
+
+
+async def async_remove_statistics(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the stored import state of a config entry."""
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.statistics").async_remove()
+
+
+def _bucket(day: date) -> datetime:
+    """Return the first whole hour bucket (UTC) of a local day.
+
+    Rounded up, so in half hour time zones the row is still counted on the
+    pickup day and not in the last bucket of the day before.
+    """
+    start = dt_util.as_utc(dt_util.start_of_local_day(day))
+    bucket = start.replace(minute=0, second=0, microsecond=0)
+    if bucket < start:
+        bucket += timedelta(hours=1)
+    return bucket
+
+
+class CollectionStatistics:
+    """Incrementally imports collection counts into the recorder."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, entry_data: dict) -> None:
+        """Initialize the importer."""
+        self._hass = hass
+        self._entry_id = entry_id
+        self._entry_data = entry_data
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.statistics"
+        )
+        # last_day: last day whose scheduled pickups were imported
+        # sums: statistic ID -> running sum
+        # collected: type ID -> last day marked collected
+        # last_reminded: pickup day of the last reminder sent
+        self._data: dict[str, Any] = {
+            "last_day": None, "sums": {}, "collected": {}, "last_reminded": None,
+        }
+        self._unsub_midnight = None
+
+    async def async_setup(self) -> None:
+        """Load the import state, catch up and import every midnight."""
+        if "recorder" not in self._hass.config.components:
+            _LOGGER.debug("Waste Manager: Recorder not loaded, no statistics")
+            return
+        if stored := await self._store.async_load():
+            self._data.update(stored)
+        await self.async_import_scheduled()
+        self._arm_midnight()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop importing."""
+        if self._unsub_midnight:
+            self._unsub_midnight()
+            self._unsub_midnight = None
+
+    @callback
+    def _arm_midnight(self) -> None:
+        """Import again right after the next local midnight."""
+        tomorrow = dt_util.now().date() + timedelta(days=1)
+
+        async def at_midnight(_now):
+            self._unsub_midnight = None
+            await self.async_import_scheduled()
+            self._arm_midnight()
+
+        self._unsub_midnight = async_track_point_in_time(
+            self._hass, at_midnight, dt_util.start_of_local_day(tomorrow)
+        )
+
+    async def async_import_scheduled(self) -> None:
+        """Import the scheduled pickups of the days not imported yet.
+
+        The first import starts from January 1st of the current year.
+        """
+        today = dt_util.now().date()
+        last_day = self._data["last_day"]
+        if last_day:
+            day = date.fromisoformat(last_day) + timedelta(days=1)
+        else:
+            day = date(today.year, 1, 1)
+        if day > today:
+            return
+
+        schedule = self._entry_data["schedule"]
+        rows: dict[str, list[StatisticData]] = {}
+        while day <= today:
+            for type_id in schedule.types_on(day):
+                stat_id = statistic_id(self._entry_id, type_id, KIND_SCHEDULED)
+                rows.setdefault(type_id, []).append(self._row(stat_id, day))
+            day += timedelta(days=1)
+
+        for type_id, type_rows in rows.items():
+            self._add(type_id, KIND_SCHEDULED, type_rows)
+        self._data["last_day"] = today.isoformat()
+        await self._store.async_save(self._data)
+
+    async def async_set_reminded(self, day: date) -> None:
+        """Remember the pickup day of the reminder just sent."""
+        if "recorder" not in self._hass.config.components:
+            return
+        self._data["last_reminded"] = day.isoformat()
+        await self._store.async_save(self._data)
+
+    async def async_mark_reminded_collected(self) -> None:
+        """Count the pickup of the last reminder as collected."""
+        if last_reminded := self._data.get("last_reminded"):
+            await self.async_mark_collected(date.fromisoformat(last_reminded))
+
+    async def async_mark_collected(self, day: date) -> None:
+        """Count the pickup of a day as collected (once per type and day)."""
+        if "recorder" not in self._hass.config.components:
+            return
+
+        schedule = self._entry_data["schedule"]
+        collected = self._data["collected"]
+        changed = False
+        for type_id in schedule.types_on(day):
+            last = collected.get(type_id)
+            if last and date.fromisoformat(last) >= day:
+                continue
+            stat_id = statistic_id(self._entry_id, type_id, KIND_COLLECTED)
+            self._add(type_id, KIND_COLLECTED, [self._row(stat_id, day)])
+            collected[type_id] = day.isoformat()
+            changed = True
+
+        if changed:
+            await self._store.async_save(self._data)
+
+    def _row(self, stat_id: str, day: date) -> StatisticData:
+        """Return a row counting one pickup and advance the running sum."""
+        sums = self._data["sums"]
+        sums[stat_id] = sums.get(stat_id, 0) + 1
+        return StatisticData(start=_bucket(day), state=1, sum=sums[stat_id])
+
+    def _add(self, type_id: str, kind: str, rows: list[StatisticData]) -> None:
+        """Queue rows of one statistic for the recorder."""
+        name = self._entry_data["types"].name(type_id)
+        metadata = StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"Gestione Rifiuti {name} {KIND_NAMES[kind]}",
+            source=DOMAIN,
+            statistic_id=statistic_id(self._entry_id, type_id, kind),
+            unit_of_measurement=None,
+        )
+        async_add_external_statistics(self._hass, metadata, rows)
@@ -0,0 +1,83 @@
+"""Persisted compiled schedules for fast restarts.
+
+The compiled window of an entry's schedule is kept in
+``.storage/waste_manager.<entry_id>.compiled`` in the binary format of
+``WasteSchedule.to_bytes()``. At startup it is read back in one go and only
+compiled again when its format or schedule revision does not match.
+"""
+from __future__ import annotations
+
+import logging
+import os
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .schedule import WasteSchedule
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _path(hass: HomeAssistant, entry_id: str) -> str:
+    """Return the cache file of a config entry."""
+    return hass.config.path(".storage", f"{DOMAIN}.{entry_id}.compiled")
+
+
+def _read(path: str) -> bytes | None:
+    """Read a whole cache file."""
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path: str, data: bytes) -> None:
+    """Atomically replace a cache file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+
+def _remove(path: str) -> None:
+    """Remove a cache file if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def async_load_compiled(
+    hass: HomeAssistant, entry_id: str, schedule: WasteSchedule
+) -> bool:
+    """Load an entry's compiled window into a schedule, if still valid."""
+    try:
+        data = await hass.async_add_executor_job(_read, _path(hass, entry_id))
+    except OSError as e:
+        _LOGGER.warning("Waste Manager: Cannot read compiled schedule: %s", e)
+        return False
+    if data is None:
+        return False
+    if not schedule.load_bytes(data):
+        _LOGGER.debug("Waste Manager: Compiled schedule of %s is stale", entry_id)
+        return False
+    return True
+
+
+async def async_save_compiled(
+    hass: HomeAssistant, entry_id: str, schedule: WasteSchedule
+) -> None:
+    """Persist an entry's compiled window."""
+    try:
+        await hass.async_add_executor_job(
+            _write, _path(hass, entry_id), schedule.to_bytes()
+        )
+    except OSError as e:
+        _LOGGER.warning("Waste Manager: Cannot save compiled schedule: %s", e)
+
+
+async def async_remove_compiled(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove an entry's compiled window."""
+    await hass.async_add_executor_job(_remove, _path(hass, entry_id))
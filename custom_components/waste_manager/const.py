@@ -10,14 +10,37 @@ CONF_FRIDAY = "friday"
 CONF_SATURDAY = "saturday"
 CONF_SUNDAY = "sunday"
 
+WEEKDAYS = [
+    CONF_MONDAY, CONF_TUESDAY, CONF_WEDNESDAY, CONF_THURSDAY,
+    CONF_FRIDAY, CONF_SATURDAY, CONF_SUNDAY,
+]
+
 CONF_COLLECTION_START = "collection_start"
 CONF_COLLECTION_END = "collection_end"
 
 CONF_NOTIFY_SERVICE = "notify_service"
 CONF_NOTIFY_TIME = "notify_time"
+CONF_REMINDERS = "reminders"
 
 CONF_ACTION_ENTITY = "action_entity"
 
 EVENT_ACTION_MARK_COLLECTED = "MARK_COLLECTED"
 
 CONF_EXCEPTIONS = "exceptions"
+
+# Structured schedule storage (config entry version 2), reminders (version 3)
+CONFIG_VERSION = 3
+CONF_SCHEDULE = "schedule"
+CONF_WASTE_TYPES = "waste_types"
+
+# Exception value meaning "no pickup on this day"
+NO_PICKUP = "Nessuno"
+
+# Notification delivery
+NOTIFY_TIMEOUT = 10
+NOTIFY_RETRIES = 2
+NOTIFY_BACKOFF_BASE = 1
+NOTIFY_BACKOFF_MAX = 8
+
+# Dispatched (with the entry ID) after an options change has been applied
+SIGNAL_CONFIG_UPDATED = f"{DOMAIN}_config_updated_{{}}"
@@ -0,0 +1,26 @@
+"""Diagnostics support for Waste Manager."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    stats = entry_data.get("notify_stats")
+    schedule = entry_data.get("schedule")
+
+    return {
+        "data": dict(entry.data),
+        "options": dict(entry.options),
+        "notify_stats": stats.as_dict() if stats else {},
+        "schedule_key": schedule.key if schedule else None,
+        "compiled_from": schedule.start.isoformat() if schedule and schedule.start else None,
+    }
@@ -0,0 +1,89 @@
+"""Localized labels for Waste Manager states and notifications.
+
+The ``labels`` section of ``translations/<language>.json`` is read once per
+language and turned into lookup tables, so building a state is a table
+lookup plus at most one ``str.format``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import logging
+import os
+
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+FALLBACK_LANGUAGE = "en"
+
+# Relative day phrases are precomputed up to this many days ahead
+RELATIVE_DAYS = 31
+
+TRANSLATIONS_DIR = os.path.join(os.path.dirname(__file__), "translations")
+
+_CACHE: dict[str, Labels] = {}
+
+
+@dataclass(frozen=True)
+class Labels:
+    """Label tables of one language."""
+
+    weekdays: tuple[str, ...]
+    relative: tuple[str, ...]
+    in_days: str
+    next_pickup: str
+    no_pickup: str
+    not_scheduled: str
+    notify_title: str
+    notify_message: str
+    notify_action: str
+    event_summary: str
+    event_description: str
+
+    @classmethod
+    def from_dict(cls, labels: dict) -> Labels:
+        """Build the tables from the ``labels`` translation section."""
+        relative = [labels["today"], labels["tomorrow"]]
+        relative += [
+            labels["in_days"].format(days=days) for days in range(2, RELATIVE_DAYS)
+        ]
+        return cls(
+            weekdays=tuple(labels["weekdays"]),
+            relative=tuple(relative),
+            in_days=labels["in_days"],
+            next_pickup=labels["next_pickup"],
+            no_pickup=labels["no_pickup"],
+            not_scheduled=labels["not_scheduled"],
+            notify_title=labels["notify_title"],
+            notify_message=labels["notify_message"],
+            notify_action=labels["notify_action"],
+            event_summary=labels["event_summary"],
+            event_description=labels["event_description"],
+        )
+
+    def days(self, days: int) -> str:
+        """Return "today", "tomorrow" or "in N days"."""
+        if days < RELATIVE_DAYS:
+            return self.relative[days]
+        return self.in_days.format(days=days)
+
+
+def _load(language: str) -> Labels:
+    """Read the labels of a language (falling back to English)."""
+    for lang in (language, FALLBACK_LANGUAGE):
+        path = os.path.join(TRANSLATIONS_DIR, f"{lang}.json")
+        try:
+            with open(path, encoding="utf-8") as file:
+                return Labels.from_dict(json.load(file)["labels"])
+        except (OSError, KeyError, ValueError) as e:
+            _LOGGER.debug("Waste Manager: No labels for %s: %s", lang, e)
+    raise FileNotFoundError(f"No labels for {language} or {FALLBACK_LANGUAGE}")
+
+
+async def async_get_labels(hass: HomeAssistant) -> Labels:
+    """Return the labels of the configured language, loading them once."""
+    language = (hass.config.language or FALLBACK_LANGUAGE).split("-")[0]
+    if language not in _CACHE:
+        _CACHE[language] = await hass.async_add_executor_job(_load, language)
+    return _CACHE[language]
@@ -0,0 +1,166 @@
+"""Notification fan-out for Waste Manager."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceNotFound, Unauthorized
+
+from .const import (
+    NOTIFY_BACKOFF_BASE,
+    NOTIFY_BACKOFF_MAX,
+    NOTIFY_RETRIES,
+    NOTIFY_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Errors that will not go away by trying again.
+PERMANENT_ERRORS = (ServiceNotFound, Unauthorized, vol.Invalid)
+
+
+@dataclass
+class TargetStats:
+    """Delivery metrics for a single notify service or action entity."""
+
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    last_latency: float | None = None
+    total_latency: float = 0.0
+    last_error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a serializable dict."""
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "last_latency": self.last_latency,
+            "avg_latency": self.total_latency / self.sent if self.sent else None,
+            "last_error": self.last_error,
+        }
+
+
+@dataclass
+class NotifyStats:
+    """Delivery metrics for every target of a config entry."""
+
+    targets: dict[str, TargetStats] = field(default_factory=dict)
+
+    def get(self, target: str) -> TargetStats:
+        """Return (creating if needed) the metrics for a target."""
+        if target not in self.targets:
+            self.targets[target] = TargetStats()
+        return self.targets[target]
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a serializable dict."""
+        return {target: stats.as_dict() for target, stats in self.targets.items()}
+
+
+def as_list(value: Any) -> list[str]:
+    """Return a config value that may be a single string as a list."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [v for v in value if v]
+
+
+async def _async_call_with_retry(
+    hass: HomeAssistant,
+    stats: TargetStats,
+    target: str,
+    domain: str,
+    service: str,
+    data: dict[str, Any],
+) -> bool:
+    """Call a service with a timeout, retrying transient failures.
+
+    Only errors raised before the call could take effect are retried; a
+    timed out call is counted as failed, so delivery is at most once.
+    """
+    for attempt in range(NOTIFY_RETRIES + 1):
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(NOTIFY_TIMEOUT):
+                await hass.services.async_call(domain, service, data, blocking=True)
+        except PERMANENT_ERRORS as e:
+            stats.failed += 1
+            stats.last_error = repr(e)
+            _LOGGER.error("Waste Manager: %s failed permanently: %s", target, e)
+            return False
+        except TimeoutError:
+            # The call may still have gone through: trying again could send
+            # a duplicate push or run an action twice
+            stats.failed += 1
+            stats.last_error = "TimeoutError"
+            _LOGGER.error(
+                "Waste Manager: %s timed out after %ss, not retried",
+                target, NOTIFY_TIMEOUT,
+            )
+            return False
+        except Exception as e:  # noqa: BLE001
+            stats.last_error = repr(e) if str(e) else type(e).__name__
+            if attempt == NOTIFY_RETRIES:
+                stats.failed += 1
+                _LOGGER.error(
+                    "Waste Manager: %s failed after %s attempts: %s",
+                    target, attempt + 1, stats.last_error,
+                )
+                return False
+            stats.retries += 1
+            delay = min(NOTIFY_BACKOFF_BASE * 2**attempt, NOTIFY_BACKOFF_MAX)
+            _LOGGER.warning(
+                "Waste Manager: %s failed (%s), retrying in %ss",
+                target, stats.last_error, delay,
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        latency = time.monotonic() - start
+        stats.sent += 1
+        stats.last_latency = latency
+        stats.total_latency += latency
+        _LOGGER.debug("Waste Manager: %s delivered in %.3fs", target, latency)
+        return True
+
+    return False
+
+
+async def async_dispatch(
+    hass: HomeAssistant,
+    stats: NotifyStats,
+    notify_services: list[str],
+    action_entities: list[str],
+    data: dict[str, Any],
+) -> dict[str, bool]:
+    """Send a notification to every target and run every action concurrently.
+
+    Each notify service and each action entity is an independent target, so a
+    slow or failing one does not hold up the others.
+    """
+    calls = {}
+    for target in notify_services:
+        service_name = target.replace("notify.", "", 1)
+        calls[target] = _async_call_with_retry(
+            hass, stats.get(target), target, "notify", service_name, data
+        )
+    for entity_id in action_entities:
+        calls[entity_id] = _async_call_with_retry(
+            hass, stats.get(entity_id), entity_id,
+            "homeassistant", "turn_on", {"entity_id": entity_id},
+        )
+
+    if not calls:
+        return {}
+
+    results = await asyncio.gather(*calls.values())
+    return dict(zip(calls, results))
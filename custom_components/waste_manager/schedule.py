@@ -0,0 +1,754 @@
+"""Structured schedule storage for Waste Manager.
+
+The options flow parses the user's free-text input once, at save time, into:
+
+* ``schedule``: weekday key -> list of waste type IDs
+* ``exceptions``: list of ``{"day", "month", "year", "types"}`` records, where
+  ``year`` is ``None`` for exceptions repeating every year and an empty
+  ``types`` list means no pickup
+* ``waste_types``: waste type ID -> ``{"name", "icon", "color"}``
+* ``reminders``: list of ``{"days_before", "time"}`` records
+
+Everything at runtime reads this structure and never parses strings.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping
+from datetime import date, datetime, time, timedelta, tzinfo
+import hashlib
+import json
+import struct
+import sys
+from typing import Any
+
+from .const import (
+    CONF_COLLECTION_END,
+    CONF_COLLECTION_START,
+    CONF_EXCEPTIONS,
+    CONF_NOTIFY_TIME,
+    CONF_REMINDERS,
+    CONF_SCHEDULE,
+    CONF_WASTE_TYPES,
+    NO_PICKUP,
+    WEEKDAYS,
+)
+from .waste_types import UNKNOWN, classify, default_color, default_icon, mdi_icon
+
+class ScheduleError(ValueError):
+    """Invalid schedule input, reported against a form field."""
+
+    def __init__(self, field: str, error: str) -> None:
+        """Initialize the error."""
+        super().__init__(f"{field}: {error}")
+        self.field = field
+        self.error = error
+
+
+def type_id(name: str) -> str:
+    """Return the stable ID of a waste type name."""
+    return name.strip().lower().replace(" ", "_")
+
+
+def parse_type_list(text: str | None, names: dict[str, str]) -> list[str]:
+    """Parse a comma separated list of waste types into type IDs.
+
+    ``names`` collects the display name of every type seen (first spelling
+    wins).
+    """
+    ids = []
+    for raw in (text or "").split(","):
+        name = raw.strip()
+        if not name:
+            continue
+        tid = type_id(name)
+        names.setdefault(tid, name)
+        if tid not in ids:
+            ids.append(tid)
+    return ids
+
+
+def parse_exceptions(
+    text: str | None, names: dict[str, str], strict: bool = True
+) -> list[dict[str, Any]]:
+    """Parse ``DD/MM[/YYYY]: Type, Type`` lines into exception records.
+
+    With ``strict`` an invalid line raises ``ScheduleError``, otherwise it is
+    skipped (used when migrating old entries).
+    """
+    records: dict[tuple, dict[str, Any]] = {}
+    for line in (text or "").splitlines():
+        if not line.strip():
+            continue
+        try:
+            if ":" not in line:
+                raise ValueError(line)
+            date_part, value = line.split(":", 1)
+            parts = [int(p) for p in date_part.strip().split("/")]
+            if len(parts) == 2:
+                day, month = parts
+                year = None
+                date(2000, month, day)  # leap year, accepts 29/02
+            elif len(parts) == 3:
+                day, month, year = parts
+                date(year, month, day)
+            else:
+                raise ValueError(line)
+        except ValueError as e:
+            if strict:
+                raise ScheduleError(CONF_EXCEPTIONS, "invalid_exception") from e
+            continue
+
+        value = value.strip()
+        types = [] if value.lower() == NO_PICKUP.lower() else parse_type_list(value, names)
+        records[(year, month, day)] = {
+            "day": day, "month": month, "year": year, "types": types,
+        }
+    return list(records.values())
+
+
+def parse_time(value: str | None, field: str) -> str:
+    """Validate an optional ``HH:MM`` time, returning it zero padded."""
+    if not value or not value.strip():
+        return ""
+    try:
+        hour, minute = map(int, value.strip().split(":"))
+    except ValueError as e:
+        raise ScheduleError(field, "invalid_time") from e
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ScheduleError(field, "invalid_time")
+    return f"{hour:02d}:{minute:02d}"
+
+
+def parse_reminders(text: str | None) -> list[dict[str, Any]]:
+    """Parse ``[-N] HH:MM`` entries into reminder records.
+
+    ``HH:MM`` reminds on the pickup day, ``-1 20:00`` the evening before.
+    """
+    reminders = []
+    for raw in (text or "").split(","):
+        entry = raw.strip()
+        if not entry:
+            continue
+        parts = entry.split()
+        days_before = 0
+        if len(parts) == 2:
+            try:
+                days_before = -int(parts[0])
+            except ValueError as e:
+                raise ScheduleError(CONF_REMINDERS, "invalid_reminder") from e
+        elif len(parts) != 1:
+            raise ScheduleError(CONF_REMINDERS, "invalid_reminder")
+        if not 0 <= days_before <= 7:
+            raise ScheduleError(CONF_REMINDERS, "invalid_reminder")
+        try:
+            at = parse_time(parts[-1], CONF_REMINDERS)
+        except ScheduleError as e:
+            raise ScheduleError(CONF_REMINDERS, "invalid_reminder") from e
+        reminder = {"days_before": days_before, "time": at}
+        if reminder not in reminders:
+            reminders.append(reminder)
+    return reminders
+
+
+def build_types(
+    names: dict[str, str],
+    previous: Mapping[str, Mapping[str, str]] | None = None,
+    icons: Mapping[str, str] | None = None,
+    colors: Mapping[str, str] | None = None,
+) -> dict[str, dict[str, str]]:
+    """Build the waste type registry for the given types.
+
+    Icons and colors come from ``icons``/``colors`` (keyed by type ID), then
+    from the ``previous`` registry, then from the name's category.
+    """
+    previous = previous or {}
+    icons = icons or {}
+    colors = colors or {}
+    types = {}
+    for tid, name in names.items():
+        old = previous.get(tid, {})
+        types[tid] = {
+            "name": old.get("name", name),
+            "icon": icons.get(tid) or old.get("icon") or default_icon(name),
+            "color": colors.get(tid) or old.get("color") or default_color(name),
+        }
+    return types
+
+
+def format_type_list(ids: list[str], types: Mapping[str, Mapping[str, str]]) -> str:
+    """Format type IDs back into the comma separated form text."""
+    return ", ".join(types.get(tid, {}).get("name", tid) for tid in ids)
+
+
+def format_exceptions(
+    records: list[Mapping[str, Any]], types: Mapping[str, Mapping[str, str]]
+) -> str:
+    """Format exception records back into the form text."""
+    lines = []
+    for record in records:
+        date_part = f"{record['day']:02d}/{record['month']:02d}"
+        if record.get("year"):
+            date_part += f"/{record['year']}"
+        value = format_type_list(record["types"], types) if record["types"] else NO_PICKUP
+        lines.append(f"{date_part}: {value}")
+    return "\n".join(lines)
+
+
+def format_reminders(reminders: list[Mapping[str, Any]]) -> str:
+    """Format reminder records back into the form text."""
+    return ", ".join(
+        f"-{r['days_before']} {r['time']}" if r["days_before"] else r["time"]
+        for r in reminders
+    )
+
+
+def normalize_input(
+    user_input: Mapping[str, Any],
+    previous_types: Mapping[str, Mapping[str, str]] | None = None,
+) -> dict[str, Any]:
+    """Validate form input and convert it into the structured schema.
+
+    Raises ``ScheduleError`` for the first invalid field.
+    """
+    clean = dict(user_input)
+    names: dict[str, str] = {}
+
+    icons = {}
+    colors = {}
+    for key in list(clean):
+        if key.startswith("icon_"):
+            icons[key[5:]] = clean.pop(key)
+        elif key.startswith("color_"):
+            colors[key[6:]] = clean.pop(key)
+
+    schedule = {}
+    for key in WEEKDAYS:
+        schedule[key] = parse_type_list(clean.pop(key, None), names)
+    exceptions = parse_exceptions(clean.get(CONF_EXCEPTIONS), names)
+
+    for key in (CONF_COLLECTION_START, CONF_COLLECTION_END):
+        if key in clean:
+            clean[key] = parse_time(clean[key], key)
+    if CONF_REMINDERS in clean:
+        clean[CONF_REMINDERS] = parse_reminders(clean[CONF_REMINDERS])
+
+    clean[CONF_SCHEDULE] = schedule
+    clean[CONF_EXCEPTIONS] = exceptions
+    clean[CONF_WASTE_TYPES] = build_types(names, previous_types, icons, colors)
+    return clean
+
+
+def set_exception_record(
+    records: list[Mapping[str, Any]], day: date, ids: list[str]
+) -> list[dict[str, Any]]:
+    """Return exception records with the one of a dated day replaced."""
+    new = [
+        dict(r) for r in records
+        if (r.get("year"), r["month"], r["day"]) != (day.year, day.month, day.day)
+    ]
+    new.append({"day": day.day, "month": day.month, "year": day.year, "types": list(ids)})
+    return new
+
+
+def migrate_config(config: Mapping[str, Any]) -> dict[str, Any]:
+    """Convert a version 1 entry (raw strings) into the structured schema."""
+    new = dict(config)
+    names: dict[str, str] = {}
+
+    schedule = {}
+    for key in WEEKDAYS:
+        schedule[key] = parse_type_list(new.pop(key, None), names)
+    exceptions = parse_exceptions(new.get(CONF_EXCEPTIONS), names, strict=False)
+
+    old_icons = new.pop("waste_icons", None) or {}
+    old_colors = new.pop("waste_colors", None) or {}
+    icons = {type_id(k): v for k, v in old_icons.items() if v}
+    colors = {type_id(k): v for k, v in old_colors.items() if v}
+
+    new[CONF_SCHEDULE] = schedule
+    new[CONF_EXCEPTIONS] = exceptions
+    new[CONF_WASTE_TYPES] = build_types(names, icons=icons, colors=colors)
+    return new
+
+
+def migrate_reminders(config: Mapping[str, Any]) -> dict[str, Any]:
+    """Convert a version 2 entry's single notify time into reminders.
+
+    An evening time used to remind about the next day's pickup, a morning
+    time about the same day's.
+    """
+    new = dict(config)
+    notify_time = new.pop(CONF_NOTIFY_TIME, None)
+    reminders = []
+    if notify_time:
+        try:
+            at = parse_time(notify_time, CONF_NOTIFY_TIME)
+        except ScheduleError:
+            at = None
+        if at:
+            days_before = 1 if int(at[:2]) >= 12 else 0
+            reminders.append({"days_before": days_before, "time": at})
+    new[CONF_REMINDERS] = reminders
+    return new
+
+
+# Days compiled ahead of the window start (covers a year of reminders)
+HORIZON_DAYS = 2 * 366
+# The window is moved forward once fewer days than this are left ahead
+MIN_DAYS_AHEAD = 366 + 7
+
+# Binary compiled schedule: magic, format version, revision (the schedule
+# key), start ordinal, number of days and size of the slot table, followed
+# by the slot table (JSON list of type ID lists, indexed by slot), the day
+# slots (uint16) and next pickup offsets (int32), little endian.
+COMPILED_MAGIC = b"WMCS"
+COMPILED_FORMAT = 2
+_HEADER = struct.Struct("<4sH32sIII")
+
+
+def schedule_key(config: Mapping[str, Any]) -> str:
+    """Return the content hash of the schedule part of an entry config.
+
+    Only the pickup days and the (ordered) type IDs count: display names,
+    icons and colors are per entry, see ``TypeRegistry``.
+    """
+    definition = {
+        CONF_SCHEDULE: config.get(CONF_SCHEDULE) or {},
+        CONF_EXCEPTIONS: config.get(CONF_EXCEPTIONS) or [],
+        CONF_WASTE_TYPES: list(config.get(CONF_WASTE_TYPES) or {}),
+    }
+    encoded = json.dumps(definition, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class WasteSchedule:
+    """Read-only, interned view of a structured schedule.
+
+    Waste types are interned to bit positions (their index in the registry)
+    and every distinct list of types collected on one day to a small integer
+    slot, so lookups and type checks compare integers only.
+
+    ``compile()`` precomputes the slot of every day of a window plus, for
+    each day, the offset of the next pickup day; lookups outside the window
+    fall back to the weekly rules and exceptions.
+    """
+
+    def __init__(self, config: Mapping[str, Any], key: str | None = None) -> None:
+        """Initialize from the entry config (options or data)."""
+        self.key = key or schedule_key(config)
+        self.start: date | None = None
+        self._start_ordinal = 0
+        self.days = array("H")
+        self.next_offsets = array("i")
+
+        self.type_ids: list[str] = list(config.get(CONF_WASTE_TYPES) or {})
+        self._bits = {tid: 1 << i for i, tid in enumerate(self.type_ids)}
+
+        # Slot 0 is "no pickup"
+        self.slots: list[tuple[str, ...]] = [()]
+        self.slot_masks: list[int] = [0]
+        self._slot_index: dict[tuple[str, ...], int] = {(): 0}
+
+        schedule = config.get(CONF_SCHEDULE) or {}
+        self.week: list[int] = [self._intern(schedule.get(key, [])) for key in WEEKDAYS]
+        self.exceptions: dict[tuple, int] = {
+            (r.get("year"), r["month"], r["day"]): self._intern(r["types"])
+            for r in config.get(CONF_EXCEPTIONS) or []
+        }
+
+    def _intern(self, ids: list[str]) -> int:
+        """Return the slot of a list of type IDs, creating it if needed."""
+        key = tuple(ids)
+        slot = self._slot_index.get(key)
+        if slot is None:
+            slot = len(self.slots)
+            self.slots.append(key)
+            self.slot_masks.append(self.mask(key))
+            self._slot_index[key] = slot
+        return slot
+
+    def clone(self, key: str) -> WasteSchedule:
+        """Return an independent copy registered under another key."""
+        other = object.__new__(WasteSchedule)
+        other.__dict__.update(self.__dict__)
+        other.key = key
+        other.type_ids = list(self.type_ids)
+        other._bits = dict(self._bits)
+        other.slots = list(self.slots)
+        other.slot_masks = list(self.slot_masks)
+        other._slot_index = dict(self._slot_index)
+        other.exceptions = dict(self.exceptions)
+        other.days = array("H", self.days)
+        other.next_offsets = array("i", self.next_offsets)
+        return other
+
+    def add_type(self, tid: str) -> None:
+        """Register a new waste type (existing bits are unchanged)."""
+        if tid in self._bits:
+            return
+        self._bits[tid] = 1 << len(self.type_ids)
+        self.type_ids.append(tid)
+
+    def set_exception(self, day: date, ids: list[str]) -> None:
+        """Set the waste types of one dated day, patching the compiled window.
+
+        Only the day itself and the next pickup offsets back to the
+        previous pickup day are updated.
+        """
+        slot = self._intern(ids)
+        self.exceptions[(day.year, day.month, day.day)] = slot
+
+        days = self.days
+        i = day.toordinal() - self._start_ordinal
+        if not 0 <= i < len(days) or days[i] == slot:
+            return
+        days[i] = slot
+
+        next_offsets = self.next_offsets
+        if slot:
+            following = i
+        elif i + 1 < len(days) and next_offsets[i + 1] >= 0:
+            following = i + 1 + next_offsets[i + 1]
+        else:
+            following = -1
+        for j in range(i, -1, -1):
+            if j < i and days[j]:
+                break
+            next_offsets[j] = following - j if following >= 0 else -1
+
+    def bit(self, tid: str) -> int:
+        """Return the bit of a waste type (0 if unknown)."""
+        return self._bits.get(tid, 0)
+
+    def mask(self, ids) -> int:
+        """Return the bit mask of a list of type IDs."""
+        mask = 0
+        for tid in ids:
+            mask |= self._bits.get(tid, 0)
+        return mask
+
+    def compile(self, start: date, days: int = HORIZON_DAYS) -> None:
+        """Precompute the slots of ``days`` days from ``start``."""
+        slots = array("H", (
+            self._rule_slot(start + timedelta(days=i)) for i in range(days)
+        ))
+        # Offset of the next pickup day at or after each day (-1: none)
+        next_offsets = array("i", [-1]) * days
+        following = -1
+        for i in range(days - 1, -1, -1):
+            if slots[i]:
+                following = i
+            next_offsets[i] = following - i if following >= 0 else -1
+
+        self.start = start
+        self._start_ordinal = start.toordinal()
+        self.days = slots
+        self.next_offsets = next_offsets
+
+    def needs_compile(self, today: date) -> bool:
+        """Return True if the window does not reach far enough past today."""
+        if self.start is None:
+            return True
+        i = today.toordinal() - self._start_ordinal
+        return i < 0 or len(self.days) - i < MIN_DAYS_AHEAD
+
+    def to_bytes(self) -> bytes:
+        """Serialize the compiled window.
+
+        Slot numbers depend on the order types were interned in (an edited
+        schedule numbers them differently from a fresh build), so the slot
+        table is stored with the days.
+        """
+        days = array("H", self.days)
+        next_offsets = array("i", self.next_offsets)
+        if sys.byteorder != "little":
+            days.byteswap()
+            next_offsets.byteswap()
+        slots = json.dumps(
+            [list(ids) for ids in self.slots], separators=(",", ":")
+        ).encode()
+        header = _HEADER.pack(
+            COMPILED_MAGIC, COMPILED_FORMAT, bytes.fromhex(self.key),
+            self._start_ordinal, len(days), len(slots),
+        )
+        return header + slots + days.tobytes() + next_offsets.tobytes()
+
+    def load_bytes(self, data: bytes) -> bool:
+        """Load a compiled window from ``to_bytes()`` output.
+
+        Returns False (leaving the compiled window untouched) if the data
+        has another format, was compiled from another schedule revision or
+        its slot table does not fit this schedule. Stored slot numbers are
+        mapped to this schedule's slots through the stored slot table.
+        """
+        if len(data) < _HEADER.size:
+            return False
+        (
+            magic, version, revision, start_ordinal, length, slots_size
+        ) = _HEADER.unpack_from(data)
+        if (
+            magic != COMPILED_MAGIC
+            or version != COMPILED_FORMAT
+            or revision != bytes.fromhex(self.key)
+            or len(data) != _HEADER.size + slots_size + 6 * length
+        ):
+            return False
+
+        offset = _HEADER.size + slots_size
+        try:
+            slots = json.loads(data[_HEADER.size:offset])
+        except ValueError:
+            return False
+        if not isinstance(slots, list) or not all(
+            isinstance(ids, list) and all(tid in self._bits for tid in ids)
+            for ids in slots
+        ):
+            return False
+
+        days = array("H")
+        days.frombytes(data[offset:offset + 2 * length])
+        next_offsets = array("i")
+        next_offsets.frombytes(data[offset + 2 * length:])
+        if sys.byteorder != "little":
+            days.byteswap()
+            next_offsets.byteswap()
+        if days and max(days) >= len(slots):
+            return False
+
+        remap = [self._intern(ids) for ids in slots]
+        if remap != list(range(len(remap))):
+            days = array("H", (remap[slot] for slot in days))
+
+        self.start = date.fromordinal(start_ordinal)
+        self._start_ordinal = start_ordinal
+        self.days = days
+        self.next_offsets = next_offsets
+        return True
+
+    def slot_on(self, day: date) -> int:
+        """Return the slot of the waste types collected on a day."""
+        i = day.toordinal() - self._start_ordinal
+        if 0 <= i < len(self.days):
+            return self.days[i]
+        return self._rule_slot(day)
+
+    def next_pickup(self, day: date, limit: int) -> date | None:
+        """Return the first pickup day within ``limit`` days from ``day``."""
+        first = 0
+        i = day.toordinal() - self._start_ordinal
+        if 0 <= i < len(self.days):
+            offset = self.next_offsets[i]
+            if offset >= 0:
+                return day + timedelta(days=offset) if offset < limit else None
+            # Nothing until the end of the window
+            first = len(self.days) - i
+        for offset in range(first, limit):
+            check_date = day + timedelta(days=offset)
+            if self.slot_on(check_date):
+                return check_date
+        return None
+
+    def iter_pickups(self, start: date, end: date) -> Iterator[tuple[date, int]]:
+        """Yield ``(day, slot)`` for every pickup day from start to end."""
+        day = start
+        while day <= end:
+            day = self.next_pickup(day, (end - day).days + 1)
+            if day is None:
+                return
+            yield day, self.slot_on(day)
+            day += timedelta(days=1)
+
+    def query(
+        self, start: date, end: date, mask: int = 0, limit: int | None = None
+    ) -> list[tuple[date, tuple[str, ...]]]:
+        """Return ``(day, type IDs)`` of the pickups from start to end.
+
+        With a ``mask`` only days collecting one of its types are returned,
+        at most ``limit`` of them.
+        """
+        result = []
+        slot_masks = self.slot_masks
+        for day, slot in self.iter_pickups(start, end):
+            if mask and not slot_masks[slot] & mask:
+                continue
+            result.append((day, self.slots[slot]))
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def _rule_slot(self, day: date) -> int:
+        """Return the slot of a day from the weekly rules and exceptions."""
+        exceptions = self.exceptions
+        if exceptions:
+            key = (day.year, day.month, day.day)
+            if key in exceptions:
+                return exceptions[key]
+            key = (None, day.month, day.day)
+            if key in exceptions:
+                return exceptions[key]
+        return self.week[day.weekday()]
+
+    def mask_on(self, day: date) -> int:
+        """Return the bit mask of the waste types collected on a day."""
+        return self.slot_masks[self.slot_on(day)]
+
+    def types_on(self, day: date) -> tuple[str, ...]:
+        """Return the waste type IDs collected on a day."""
+        return self.slots[self.slot_on(day)]
+
+    def next_reminder(
+        self, reminders: list[Mapping[str, Any]], now: datetime, tz: tzinfo
+    ) -> tuple[datetime, list[tuple[date, int]]] | None:
+        """Return the next reminder instant after ``now``.
+
+        Returns the instant and the ``(pickup date, days before)`` pairs due
+        at it, or None if nothing is collected within a year.
+        """
+        if not reminders:
+            return None
+
+        times = [
+            (r["days_before"], time.fromisoformat(r["time"])) for r in reminders
+        ]
+        max_before = max(days_before for days_before, _ in times)
+        earliest = min(at for _, at in times)
+
+        best = None
+        due: list[tuple[date, int]] = []
+        today = now.date()
+        for i in range(366 + max_before):
+            pickup = today + timedelta(days=i)
+            if best is not None and datetime.combine(
+                pickup - timedelta(days=max_before), earliest, tz
+            ) > best:
+                break
+            if not self.slot_on(pickup):
+                continue
+            for days_before, at in times:
+                fire = datetime.combine(pickup - timedelta(days=days_before), at, tz)
+                if fire <= now:
+                    continue
+                if best is None or fire < best:
+                    best = fire
+                    due = [(pickup, days_before)]
+                elif fire == best:
+                    due.append((pickup, days_before))
+
+        if best is None:
+            return None
+        return best, due
+
+
+class TypeRegistry:
+    """Display names, icons and colors of an entry's waste types.
+
+    Kept apart from the (shared) ``WasteSchedule``, so entries differing
+    only in how their types look still share one compiled schedule.
+    """
+
+    def __init__(self, types: Mapping[str, Mapping[str, str]]) -> None:
+        """Initialize from the ``waste_types`` registry of an entry config."""
+        self.types = types
+        self._categories = {tid: classify(t["name"]) for tid, t in types.items()}
+
+    def name(self, tid: str) -> str:
+        """Return the display name of a waste type."""
+        return self.types.get(tid, {}).get("name", tid)
+
+    def names(self, ids) -> list[str]:
+        """Return the display names of a list of waste types."""
+        return [self.name(tid) for tid in ids]
+
+    def mdi_icon(self, ids) -> str:
+        """Return the MDI icon for a list of waste types.
+
+        The category that comes first in the canonical registry wins.
+        """
+        categories = [
+            category
+            for tid in ids
+            if (category := self._categories.get(tid, UNKNOWN)) != UNKNOWN
+        ]
+        return mdi_icon(min(categories) if categories else UNKNOWN)
+
+
+class SchedulePool:
+    """Compiled schedules shared by every entry with the same definition.
+
+    Schedules are keyed by ``schedule_key()`` and reference counted, so
+    neighbours in the same collection zone share one compiled schedule and
+    one midnight check of its window.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty pool."""
+        self._schedules: dict[str, WasteSchedule] = {}
+        self._refs: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        """Return the number of distinct schedules."""
+        return len(self._schedules)
+
+    def acquire(self, config: Mapping[str, Any]) -> WasteSchedule:
+        """Return the shared schedule of an entry config.
+
+        A new schedule is not compiled yet (``start`` is None), so the
+        caller can load it from the compiled cache or compile it.
+        """
+        key = schedule_key(config)
+        schedule = self._schedules.get(key)
+        if schedule is None:
+            schedule = WasteSchedule(config, key)
+            self._schedules[key] = schedule
+            self._refs[key] = 0
+        self._refs[key] += 1
+        return schedule
+
+    def detach(
+        self, schedule: WasteSchedule, key: str
+    ) -> tuple[WasteSchedule, bool]:
+        """Move one reference of a schedule about to be edited to a new key.
+
+        Returns the schedule to use and whether the edit still has to be
+        applied to it: False when the pool already holds the edited
+        definition. A schedule used by other entries is copied first.
+        """
+        existing = self._schedules.get(key)
+        if existing is not None:
+            self._refs[key] += 1
+            self.release(schedule)
+            return existing, False
+
+        if self._refs.get(schedule.key) == 1:
+            del self._schedules[schedule.key]
+            del self._refs[schedule.key]
+            schedule.key = key
+        else:
+            self.release(schedule)
+            schedule = schedule.clone(key)
+        self._schedules[key] = schedule
+        self._refs[key] = 1
+        return schedule, True
+
+    def release(self, schedule: WasteSchedule) -> None:
+        """Drop a reference, forgetting the schedule when unused."""
+        key = schedule.key
+        if key not in self._refs:
+            return
+        self._refs[key] -= 1
+        if self._refs[key] <= 0:
+            del self._refs[key]
+            del self._schedules[key]
+
+    def roll(self, today: date) -> list[WasteSchedule]:
+        """Move the windows that no longer reach far enough to start today.
+
+        Returns the schedules that were compiled again.
+        """
+        rolled = []
+        for schedule in self._schedules.values():
+            if schedule.needs_compile(today):
+                schedule.compile(today)
+                rolled.append(schedule)
+        return rolled
@@ -9,20 +9,18 @@ from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv, entity_platform
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.util import dt as dt_util
 
 from .const import (
-    CONF_MONDAY,
-    CONF_TUESDAY,
-    CONF_WEDNESDAY,
-    CONF_THURSDAY,
-    CONF_FRIDAY,
-    CONF_SATURDAY,
-    CONF_SUNDAY,
+    DOMAIN,
     CONF_COLLECTION_START,
     CONF_COLLECTION_END,
+    SIGNAL_CONFIG_UPDATED,
 )
+from .waste_types import DEFAULT_COLOR
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,26 +31,50 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform."""
-    entities = [WastePickupSensor(config_entry)]
+    entry_data = hass.data[DOMAIN][config_entry.entry_id]
+    pickup_sensor = WastePickupSensor(config_entry, entry_data)
     
-    # Identify unique waste types for separate sensors
-    config = config_entry.options if config_entry.options else config_entry.data
-    week_schedule = [
-        config.get(CONF_MONDAY), config.get(CONF_TUESDAY), config.get(CONF_WEDNESDAY),
-        config.get(CONF_THURSDAY), config.get(CONF_FRIDAY), config.get(CONF_SATURDAY),
-        config.get(CONF_SUNDAY)
-    ]
-    
-    unique_types = set()
-    for day_str in week_schedule:
-        if day_str:
-             types = [t.strip() for t in day_str.split(",") if t.strip()]
-             unique_types.update(types)
-             
-    for waste_type in unique_types:
-        entities.append(WasteTypeSensor(config_entry, waste_type))
+    # One sensor per waste type of the registry
+    type_sensors: dict[str, WasteTypeSensor] = {
+        type_id: WasteTypeSensor(config_entry, entry_data, type_id, info["name"])
+        for type_id, info in entry_data["types"].types.items()
+    }
+
+    async_add_entities([pickup_sensor, *type_sensors.values()])
+
+    async def async_config_updated() -> None:
+        """Apply an options change without reloading the entry."""
+        types = entry_data["types"].types
+        registry = er.async_get(hass)
+
+        for type_id in [t for t in type_sensors if t not in types]:
+            sensor = type_sensors.pop(type_id)
+            if sensor.registry_entry is not None:
+                registry.async_remove(sensor.entity_id)
+            else:
+                await sensor.async_remove()
+
+        refresh = [pickup_sensor, *type_sensors.values()]
+        added = [
+            WasteTypeSensor(config_entry, entry_data, type_id, info["name"])
+            for type_id, info in types.items()
+            if type_id not in type_sensors
+        ]
+        for sensor in added:
+            type_sensors[sensor.type_id] = sensor
+        if added:
+            async_add_entities(added, True)
+
+        for sensor in refresh:
+            sensor.async_schedule_update_ha_state(True)
 
-    async_add_entities(entities)
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            SIGNAL_CONFIG_UPDATED.format(config_entry.entry_id),
+            async_config_updated,
+        )
+    )
 
 
 
@@ -60,14 +82,16 @@ async def async_setup_entry(
 class WasteTypeSensor(SensorEntity):
     """Sensor for a specific waste type."""
     
-    def __init__(self, config_entry: ConfigEntry, waste_type: str) -> None:
+    def __init__(
+        self, config_entry: ConfigEntry, entry_data: dict, type_id: str, waste_type: str
+    ) -> None:
         """Initialize the sensor."""
         self._config_entry = config_entry
+        self._entry_data = entry_data
+        self.type_id = type_id
         self._waste_type = waste_type
         
-        # ID safe name
-        safe_type = waste_type.lower().replace(" ", "_")
-        self._attr_unique_id = f"waste_manager_{safe_type}"
+        self._attr_unique_id = f"{config_entry.entry_id}_{type_id}"
         self._attr_name = f"Gestione Rifiuti {waste_type}"
         self._attr_icon = "mdi:recycle"
         
@@ -76,63 +100,25 @@ class WasteTypeSensor(SensorEntity):
 
     def update(self) -> None:
         """Calculate next pickup for this specific type."""
-        config = self._config_entry.options if self._config_entry.options else self._config_entry.data
-        
-        week_schedule = {
-            0: config.get(CONF_MONDAY),
-            1: config.get(CONF_TUESDAY),
-            2: config.get(CONF_WEDNESDAY),
-            3: config.get(CONF_THURSDAY),
-            4: config.get(CONF_FRIDAY),
-            5: config.get(CONF_SATURDAY),
-            6: config.get(CONF_SUNDAY),
-        }
+        schedule = self._entry_data["schedule"]
+        labels = self._entry_data["labels"]
 
         today = dt_util.now().date()
         
         days_until = None
         pickup_date = None
-        
-        # Parse Exceptions
-        exceptions_map = {}
-        exceptions_text = config.get("exceptions", "")
-        if exceptions_text:
-            for line in exceptions_text.splitlines():
-                if ":" in line:
-                    d_str, v = line.split(":", 1)
-                    try:
-                        d, m = map(int, d_str.strip().split("/"))
-                        exceptions_map[(d, m)] = v.strip()
-                    except ValueError:
-                        pass
 
         # Find next occurrence
+        bit = schedule.bit(self.type_id)
         for i in range(30): # Look ahead 1 month
             check_date = today + timedelta(days=i)
-            
-            # Check Exception
-            waste_type_raw = None
-            if (check_date.day, check_date.month) in exceptions_map:
-                waste_type_raw = exceptions_map[(check_date.day, check_date.month)]
-                if waste_type_raw.lower() == "nessuno":
-                    waste_type_raw = None
-            else:
-                waste_type_raw = week_schedule.get(check_date.weekday())
-            
-            if waste_type_raw:
-                types = [t.strip().lower() for t in waste_type_raw.split(",")]
-                if self._waste_type.lower() in types:
-                    days_until = i
-                    pickup_date = check_date
-                    break
+            if schedule.mask_on(check_date) & bit:
+                days_until = i
+                pickup_date = check_date
+                break
         
         if days_until is not None:
-             if days_until == 0:
-                 self._attr_native_value = "Oggi"
-             elif days_until == 1:
-                 self._attr_native_value = "Domani"
-             else:
-                 self._attr_native_value = f"Tra {days_until} giorni"
+             self._attr_native_value = labels.days(days_until)
                  
              self._attr_extra_state_attributes = {
                  "days_until": days_until,
@@ -140,12 +126,13 @@ class WasteTypeSensor(SensorEntity):
              }
              
              # Color
-             colors = config.get("waste_colors", {})
-             if self._waste_type in colors and colors[self._waste_type] != "default":
-                 self._attr_extra_state_attributes["color"] = colors[self._waste_type]
+             types = self._entry_data["types"].types
+             color = types.get(self.type_id, {}).get("color", DEFAULT_COLOR)
+             if color != DEFAULT_COLOR:
+                 self._attr_extra_state_attributes["color"] = color
                  
         else:
-             self._attr_native_value = "Non programmato"
+             self._attr_native_value = labels.not_scheduled
              self._attr_extra_state_attributes = {}
 
 
@@ -154,11 +141,12 @@ class WastePickupSensor(SensorEntity):
 
     _attr_has_entity_name = True
     _attr_name = "Next Waste Pickup"
-    _attr_unique_id = "waste_manager_next_pickup"
 
-    def __init__(self, config_entry: ConfigEntry) -> None:
+    def __init__(self, config_entry: ConfigEntry, entry_data: dict) -> None:
         """Initialize the sensor."""
         self._config_entry = config_entry
+        self._entry_data = entry_data
+        self._attr_unique_id = f"{config_entry.entry_id}_next_pickup"
         self._attr_native_value = None
         self._attr_extra_state_attributes = {}
         self._attr_icon = "mdi:delete-empty"
@@ -182,87 +170,48 @@ class WastePickupSensor(SensorEntity):
         """Fetch new state data for the sensor."""
         # Get configuration from options if available, otherwise data
         config = self._config_entry.options if self._config_entry.options else self._config_entry.data
-        
-        # Map days to config keys
-        week_schedule = {
-            0: config.get(CONF_MONDAY),
-            1: config.get(CONF_TUESDAY),
-            2: config.get(CONF_WEDNESDAY),
-            3: config.get(CONF_THURSDAY),
-            4: config.get(CONF_FRIDAY),
-            5: config.get(CONF_SATURDAY),
-            6: config.get(CONF_SUNDAY),
-        }
+        schedule = self._entry_data["schedule"]
+        registry = self._entry_data["types"]
+        labels = self._entry_data["labels"]
 
         today = dt_util.now().date()
-        today_weekday = today.weekday()
 
-        found_pickup_raw = None
+        next_types = None
         days_until = None
         pickup_date = None
 
-        # Parse Exceptions
-        exceptions_map = {}
-        exceptions_text = config.get("exceptions", "")
-        if exceptions_text:
-            for line in exceptions_text.splitlines():
-                if ":" in line:
-                    d_str, v = line.split(":", 1)
-                    try:
-                        d, m = map(int, d_str.strip().split("/"))
-                        exceptions_map[(d, m)] = v.strip()
-                    except ValueError:
-                        pass
-
         # Calculate upcoming schedule
         # Check next 15 days
         upcoming_schedule = []
         for i in range(15): 
             check_date = today + timedelta(days=i)
+            type_ids = schedule.types_on(check_date)
             
-            # Check Exception
-            waste_type_raw = None
-            if (check_date.day, check_date.month) in exceptions_map:
-                waste_type_raw = exceptions_map[(check_date.day, check_date.month)]
-                if waste_type_raw.lower() == "nessuno":
-                    waste_type_raw = None
-            else:
-                waste_type_raw = week_schedule.get(check_date.weekday())
-            
-            if waste_type_raw and waste_type_raw.strip():
-                waste_types = [w.strip() for w in waste_type_raw.split(",") if w.strip()]
-                
-                day_name_map = {
-                    0: "Lunedì", 1: "Martedì", 2: "Mercoledì", 3: "Giovedì", 
-                    4: "Venerdì", 5: "Sabato", 6: "Domenica"
-                }
+            if type_ids:
+                waste_types = registry.names(type_ids)
                 
                 # Determine upcoming items (limit to 5)
                 if len(upcoming_schedule) < 5:
                     upcoming_schedule.append({
                         "date": check_date.isoformat(),
-                        "day": day_name_map.get(check_date.weekday(), ""),
+                        "day": labels.weekdays[check_date.weekday()],
                         "waste_types": waste_types,
                         "days_until": i
                     })
                 
                 # Check for NEXT pickup (only once)
-                if found_pickup_raw is None:
-                    found_pickup_raw = waste_type_raw
+                if next_types is None:
+                    next_types = type_ids
                     days_until = i
                     pickup_date = check_date
                     
-        if found_pickup_raw:
-            # Handle multiple types separated by comma
-            waste_types = [w.strip() for w in found_pickup_raw.split(",") if w.strip()]
+        if next_types:
+            waste_types = registry.names(next_types)
             found_pickup = ", ".join(waste_types)
 
-            if days_until == 0:
-                self._attr_native_value = f"{found_pickup} (Oggi)"
-            elif days_until == 1:
-                self._attr_native_value = f"{found_pickup} (Domani)"
-            else:
-                self._attr_native_value = f"{found_pickup} (Tra {days_until} giorni)"
+            self._attr_native_value = labels.next_pickup.format(
+                types=found_pickup, when=labels.days(days_until)
+            )
             
             self._attr_extra_state_attributes = {
                 "waste_type": found_pickup,
@@ -272,22 +221,14 @@ class WastePickupSensor(SensorEntity):
                 "upcoming_schedule": upcoming_schedule,
                 "collection_start": config.get(CONF_COLLECTION_START, ""),
                 "collection_end": config.get(CONF_COLLECTION_END, ""),
-                "waste_icons": config.get("waste_icons", {}),
-                "waste_colors": config.get("waste_colors", {}),
+                "waste_icons": {t["name"]: t["icon"] for t in registry.types.values()},
+                "waste_colors": {t["name"]: t["color"] for t in registry.types.values()},
             }
 
-            # Update icon based on keywords in the full string
-            waste_lower = found_pickup.lower()
-            if "plastica" in waste_lower:
-                self._attr_icon = "mdi:recycle"
-            elif "umido" in waste_lower:
-                self._attr_icon = "mdi:food-apple"
-            elif "carta" in waste_lower:
-                self._attr_icon = "mdi:newspaper"
-            else:
-                self._attr_icon = "mdi:delete-empty"
+            # Update icon based on the waste categories
+            self._attr_icon = registry.mdi_icon(next_types)
         else:
-            self._attr_native_value = "Nessun ritiro programmato"
+            self._attr_native_value = labels.no_pickup
             self._attr_extra_state_attributes = {
                 "waste_type": None,
                 "waste_types": [],
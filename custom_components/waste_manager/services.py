@@ -0,0 +1,142 @@
+"""Schedule query services for Waste Manager."""
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .schedule import type_id
+
+SERVICE_GET_SCHEDULE = "get_schedule"
+SERVICE_NEXT_PICKUPS = "next_pickups"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_WASTE_TYPES = "waste_types"
+ATTR_LIMIT = "limit"
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+DEFAULT_LIMIT = 1
+MAX_LIMIT = 100
+
+_BASE_SCHEMA = {
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    vol.Optional(ATTR_START_DATE): cv.date,
+    vol.Optional(ATTR_WASTE_TYPES): vol.All(cv.ensure_list_csv, [cv.string]),
+}
+
+GET_SCHEDULE_SCHEMA = vol.Schema({
+    **_BASE_SCHEMA,
+    vol.Optional(ATTR_END_DATE): cv.date,
+    vol.Optional(ATTR_LIMIT): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_LIMIT)),
+})
+
+NEXT_PICKUPS_SCHEMA = vol.Schema({
+    **_BASE_SCHEMA,
+    vol.Optional(ATTR_LIMIT, default=DEFAULT_LIMIT): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=MAX_LIMIT)
+    ),
+})
+
+
+def _entries(hass: HomeAssistant, call: ServiceCall) -> dict[str, dict]:
+    """Return the loaded entries a call is about."""
+    entries = {
+        entry_id: entry_data
+        for entry_id, entry_data in hass.data.get(DOMAIN, {}).items()
+        if isinstance(entry_data, dict) and "schedule" in entry_data
+    }
+    if ATTR_CONFIG_ENTRY_ID in call.data:
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        if entry_id not in entries:
+            raise ServiceValidationError(f"Waste Manager entry not loaded: {entry_id}")
+        return {entry_id: entries[entry_id]}
+    return entries
+
+
+def _query(
+    hass: HomeAssistant, call: ServiceCall, start: date, end: date, limit: int | None
+) -> ServiceResponse:
+    """Answer a query from the compiled schedule of every entry."""
+    wanted = [type_id(t) for t in call.data.get(ATTR_WASTE_TYPES, [])]
+
+    entries = _entries(hass, call)
+    known = {
+        tid for entry_data in entries.values() for tid in entry_data["schedule"].type_ids
+    }
+    if unknown := [t for t in wanted if t not in known]:
+        raise ServiceValidationError(f"Unknown waste types: {', '.join(unknown)}")
+
+    today = dt_util.now().date()
+    pickups = []
+    for entry_id, entry_data in entries.items():
+        schedule = entry_data["schedule"]
+        mask = schedule.mask(wanted)
+        if wanted and not mask:
+            # None of the requested types is collected here
+            continue
+        for day, type_ids in schedule.query(start, end, mask, limit):
+            pickups.append({
+                "date": day.isoformat(),
+                "days_until": (day - today).days,
+                "waste_types": entry_data["types"].names(type_ids),
+                "type_ids": list(type_ids),
+                ATTR_CONFIG_ENTRY_ID: entry_id,
+            })
+
+    pickups.sort(key=lambda pickup: pickup["date"])
+    if limit is not None:
+        pickups = pickups[:limit]
+    return {"pickups": pickups}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Waste Manager services."""
+
+    @callback
+    def get_schedule(call: ServiceCall) -> ServiceResponse:
+        """Return the pickups in a date window."""
+        start = call.data.get(ATTR_START_DATE) or dt_util.now().date()
+        end = call.data.get(ATTR_END_DATE) or start + timedelta(days=DEFAULT_DAYS)
+        if end < start or (end - start).days > MAX_DAYS:
+            raise ServiceValidationError(
+                f"end_date must be within {MAX_DAYS} days after start_date"
+            )
+        return _query(hass, call, start, end, call.data.get(ATTR_LIMIT))
+
+    @callback
+    def next_pickups(call: ServiceCall) -> ServiceResponse:
+        """Return the next pickups (of the given types)."""
+        start = call.data.get(ATTR_START_DATE) or dt_util.now().date()
+        end = start + timedelta(days=MAX_DAYS)
+        return _query(hass, call, start, end, call.data[ATTR_LIMIT])
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_SCHEDULE,
+        get_schedule,
+        schema=GET_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_NEXT_PICKUPS,
+        next_pickups,
+        schema=NEXT_PICKUPS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -0,0 +1,78 @@
+"""Canonical waste type registry for Waste Manager.
+
+Every known kind of waste has a stable integer ID (its index in
+``CATEGORIES``), a list of aliases and its default image, color and MDI
+icon. User supplied type names are matched against the aliases by a single
+regular expression compiled at import time; the first category (in
+``CATEGORIES`` order) with an alias contained in the name wins.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+
+DEFAULT_ICON = "default.png"
+DEFAULT_COLOR = "default"
+DEFAULT_MDI = "mdi:delete-empty"
+
+# Returned by classify() for names that match no category
+UNKNOWN = -1
+
+
+@dataclass(frozen=True)
+class WasteCategory:
+    """A canonical kind of waste."""
+
+    key: str
+    aliases: tuple[str, ...]
+    icon: str
+    color: str
+    mdi: str = DEFAULT_MDI
+
+
+CATEGORIES: tuple[WasteCategory, ...] = (
+    WasteCategory("plastica", ("plastica", "plastic"), "plastica.png", "#FFEB3B", "mdi:recycle"),
+    WasteCategory("carta", ("carta", "paper"), "carta.png", "#2196F3", "mdi:newspaper"),
+    WasteCategory("umido", ("umido", "organico", "organic"), "umido.png", "#795548", "mdi:food-apple"),
+    WasteCategory("vetro", ("vetro", "glass"), "vetro.png", "#4CAF50"),
+    WasteCategory("indifferenziata", ("indifferenziata", "secco"), "indifferenziata.png", "#9E9E9E"),
+    WasteCategory("metallo", ("metallo", "metal"), "metallo.png", "#FF9800"),
+    WasteCategory("verde", ("verde", "sfalci", "garden"), "verde.png", "#4CAF50"),
+)
+
+# One lookahead group per category, tried in order from the start of the
+# name: the index of the group that matched is the category ID.
+_CLASSIFIER = re.compile(
+    "^(?:"
+    + "|".join(
+        "((?=.*?(?:" + "|".join(re.escape(a) for a in c.aliases) + ")))"
+        for c in CATEGORIES
+    )
+    + ")",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def classify(name: str) -> int:
+    """Return the category ID of a waste type name, or ``UNKNOWN``."""
+    match = _CLASSIFIER.match(name)
+    if match is None:
+        return UNKNOWN
+    return match.lastindex - 1
+
+
+def default_icon(name: str) -> str:
+    """Return the default image for a waste type name."""
+    category = classify(name)
+    return CATEGORIES[category].icon if category != UNKNOWN else DEFAULT_ICON
+
+
+def default_color(name: str) -> str:
+    """Return the default color for a waste type name."""
+    category = classify(name)
+    return CATEGORIES[category].color if category != UNKNOWN else DEFAULT_COLOR
+
+
+def mdi_icon(category: int) -> str:
+    """Return the MDI icon of a category ID."""
+    return CATEGORIES[category].mdi if category != UNKNOWN else DEFAULT_MDI
@@ -51,21 +51,10 @@ class WasteCard extends HTMLElement {
             const wasteIcons = attributes.waste_icons || {};
             const wasteColors = attributes.waste_colors || {};
 
-            // Helper to get icon
+            // Icons are resolved by the integration's waste type registry
             const getIcon = (type) => {
                 if (!type) return "default.png";
-                if (wasteIcons[type]) {
-                    return wasteIcons[type];
-                }
-                const typeLower = type.toLowerCase();
-                if (typeLower.includes("plastica")) return "plastica.png";
-                if (typeLower.includes("carta")) return "carta.png";
-                if (typeLower.includes("umido")) return "umido.png";
-                if (typeLower.includes("vetro")) return "vetro.png";
-                if (typeLower.includes("indifferenziata") || typeLower.includes("secco")) return "indifferenziata.png";
-                if (typeLower.includes("metallo")) return "metallo.png";
-                if (typeLower.includes("verde") || typeLower.includes("sfalci")) return "verde.png";
-                return "default.png";
+                return wasteIcons[type] || "default.png";
             };
 
             // Determine main image and color
@@ -0,0 +1,104 @@
+"""Frozen reference lookups of the original (version 1) Waste Manager.
+
+Copied from ``WastePickupSensor.update``, ``WasteTypeSensor.update`` and
+``WasteManagerCalendar.async_get_events`` before the structured schedule,
+working on the raw weekday strings and exception text. Do not change: the
+schedule engine is checked against these.
+"""
+from datetime import timedelta
+
+WEEK_KEYS = [
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+]
+
+
+def _week_schedule(config):
+    return {i: config.get(key) for i, key in enumerate(WEEK_KEYS)}
+
+
+def _exceptions_map(config):
+    exceptions_map = {}
+    exceptions_text = config.get("exceptions", "")
+    if exceptions_text:
+        for line in exceptions_text.splitlines():
+            if ":" in line:
+                d_str, v = line.split(":", 1)
+                try:
+                    d, m = map(int, d_str.strip().split("/"))
+                    exceptions_map[(d, m)] = v.strip()
+                except ValueError:
+                    pass
+    return exceptions_map
+
+
+def _raw_on(week_schedule, exceptions_map, check_date):
+    if (check_date.day, check_date.month) in exceptions_map:
+        waste_type_raw = exceptions_map[(check_date.day, check_date.month)]
+        if waste_type_raw.lower() == "nessuno":
+            waste_type_raw = None
+    else:
+        waste_type_raw = week_schedule.get(check_date.weekday())
+    return waste_type_raw
+
+
+def weekly_types(config):
+    """Return the waste types that got their own sensor."""
+    unique_types = set()
+    for day_str in _week_schedule(config).values():
+        if day_str:
+            unique_types.update(t.strip() for t in day_str.split(",") if t.strip())
+    return unique_types
+
+
+def next_pickup(config, today):
+    """Return ``(waste types, days until, upcoming schedule)`` of the sensor."""
+    week_schedule = _week_schedule(config)
+    exceptions_map = _exceptions_map(config)
+
+    found_pickup_raw = None
+    days_until = None
+    upcoming_schedule = []
+    for i in range(15):
+        check_date = today + timedelta(days=i)
+        waste_type_raw = _raw_on(week_schedule, exceptions_map, check_date)
+        if waste_type_raw and waste_type_raw.strip():
+            waste_types = [w.strip() for w in waste_type_raw.split(",") if w.strip()]
+            if len(upcoming_schedule) < 5:
+                upcoming_schedule.append((check_date, waste_types, i))
+            if found_pickup_raw is None:
+                found_pickup_raw = waste_type_raw
+                days_until = i
+
+    if found_pickup_raw:
+        waste_types = [w.strip() for w in found_pickup_raw.split(",") if w.strip()]
+        return waste_types, days_until, upcoming_schedule
+    return [], None, []
+
+
+def type_days_until(config, waste_type, today):
+    """Return the days until the next pickup of one type (30 days ahead)."""
+    week_schedule = _week_schedule(config)
+    exceptions_map = _exceptions_map(config)
+    for i in range(30):
+        check_date = today + timedelta(days=i)
+        waste_type_raw = _raw_on(week_schedule, exceptions_map, check_date)
+        if waste_type_raw:
+            types = [t.strip().lower() for t in waste_type_raw.split(",")]
+            if waste_type.lower() in types:
+                return i
+    return None
+
+
+def events(config, start, end):
+    """Return the ``(day, waste types)`` calendar events from start to end."""
+    week_schedule = _week_schedule(config)
+    exceptions_map = _exceptions_map(config)
+    result = []
+    current_date = start
+    while current_date <= end:
+        waste_type = _raw_on(week_schedule, exceptions_map, current_date)
+        if waste_type:
+            types = [t.strip() for t in waste_type.split(",") if t.strip()]
+            result.append((current_date, types))
+        current_date += timedelta(days=1)
+    return result
@@ -0,0 +1,22 @@
+"""Load the Home Assistant independent modules of Waste Manager.
+
+``schedule``, ``waste_types`` and ``const`` import nothing from Home
+Assistant, so they are loaded as a bare ``waste_manager`` package without
+running the integration's ``__init__``.
+"""
+import os
+import sys
+import types
+
+COMPONENT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "custom_components",
+    "waste_manager",
+)
+
+if "waste_manager" not in sys.modules:
+    package = types.ModuleType("waste_manager")
+    package.__path__ = [COMPONENT_DIR]
+    sys.modules["waste_manager"] = package
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,125 @@
+"""Tests of reminder parsing, migration and scheduling."""
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from waste_manager.schedule import (
+    ScheduleError,
+    WasteSchedule,
+    migrate_config,
+    migrate_reminders,
+    parse_reminders,
+)
+
+ROME = ZoneInfo("Europe/Rome")
+
+
+def schedule_of(**days: str) -> WasteSchedule:
+    """Return the schedule of version 1 weekday strings."""
+    return WasteSchedule(migrate_config(days))
+
+
+def test_parse_reminders() -> None:
+    """Reminders are ``[-N] HH:MM``, zero padded and deduplicated."""
+    assert parse_reminders("20:00, -1 20:00, -2 7:5, 20:00") == [
+        {"days_before": 0, "time": "20:00"},
+        {"days_before": 1, "time": "20:00"},
+        {"days_before": 2, "time": "07:05"},
+    ]
+    assert parse_reminders("") == []
+    assert parse_reminders(None) == []
+
+
+@pytest.mark.parametrize("text", ["-8 10:00", "+1 10:00", "x 10:00", "1 2 3", "25:00"])
+def test_parse_reminders_invalid(text: str) -> None:
+    """Invalid reminders are reported against the reminders field."""
+    with pytest.raises(ScheduleError) as err:
+        parse_reminders(text)
+    assert (err.value.field, err.value.error) == ("reminders", "invalid_reminder")
+
+
+@pytest.mark.parametrize(
+    ("notify_time", "expected"),
+    [
+        ("20:00", [{"days_before": 1, "time": "20:00"}]),
+        ("12:00", [{"days_before": 1, "time": "12:00"}]),
+        ("7:30", [{"days_before": 0, "time": "07:30"}]),
+        ("not a time", []),
+        (None, []),
+    ],
+)
+def test_migrate_reminders(notify_time: str | None, expected: list[dict]) -> None:
+    """An evening notify time reminds the day before, a morning one the same day."""
+    config = {"reminders": "stale"}
+    if notify_time is not None:
+        config["notify_time"] = notify_time
+    migrated = migrate_reminders(config)
+    assert migrated["reminders"] == expected
+    assert "notify_time" not in migrated
+
+
+def test_next_reminder_follows_lead_times() -> None:
+    """Reminders fire in instant order, whatever their order in the config."""
+    # Monday 19/10/2026 and Thursday 22/10/2026
+    schedule = schedule_of(monday="Carta", thursday="Vetro")
+    times = parse_reminders("07:00, -1 20:00")
+
+    now = datetime(2026, 10, 18, 12, 0, tzinfo=ROME)
+    fired = []
+    for _ in range(4):
+        now, due = schedule.next_reminder(times, now, ROME)
+        fired.append((now, due))
+
+    assert fired == [
+        (datetime(2026, 10, 18, 20, 0, tzinfo=ROME), [(date(2026, 10, 19), 1)]),
+        (datetime(2026, 10, 19, 7, 0, tzinfo=ROME), [(date(2026, 10, 19), 0)]),
+        (datetime(2026, 10, 21, 20, 0, tzinfo=ROME), [(date(2026, 10, 22), 1)]),
+        (datetime(2026, 10, 22, 7, 0, tzinfo=ROME), [(date(2026, 10, 22), 0)]),
+    ]
+
+
+def test_next_reminder_longer_lead_time_first() -> None:
+    """A reminder days ahead of a later pickup can come first."""
+    # Wednesday 21/10/2026 and Friday 23/10/2026
+    schedule = schedule_of(wednesday="Carta", friday="Vetro")
+    now = datetime(2026, 10, 20, 12, 0, tzinfo=ROME)
+    assert schedule.next_reminder(parse_reminders("21:00, -2 08:00"), now, ROME) == (
+        datetime(2026, 10, 21, 8, 0, tzinfo=ROME), [(date(2026, 10, 23), 2)],
+    )
+
+
+def test_next_reminder_merges_same_instant() -> None:
+    """Reminders of different pickups due at the same instant fire together."""
+    # Monday 19/10/2026 and Tuesday 20/10/2026
+    schedule = schedule_of(monday="Carta", tuesday="Vetro")
+    now = datetime(2026, 10, 18, 12, 0, tzinfo=ROME)
+    assert schedule.next_reminder(parse_reminders("08:00, -1 08:00"), now, ROME) == (
+        datetime(2026, 10, 19, 8, 0, tzinfo=ROME),
+        [(date(2026, 10, 19), 0), (date(2026, 10, 20), 1)],
+    )
+
+
+def test_next_reminder_none() -> None:
+    """Without reminders or pickups there is nothing to arm."""
+    now = datetime(2026, 10, 18, 12, 0, tzinfo=ROME)
+    assert schedule_of(monday="Carta").next_reminder([], now, ROME) is None
+    assert schedule_of().next_reminder(parse_reminders("20:00"), now, ROME) is None
+
+
+@pytest.mark.parametrize(
+    ("now", "utc"),
+    [
+        # Summer time starts on Sunday 29/03/2026
+        (datetime(2026, 3, 28, 21, 0, tzinfo=ROME), datetime(2026, 3, 29, 18, 0)),
+        # Summer time ends on Sunday 25/10/2026
+        (datetime(2026, 10, 24, 21, 0, tzinfo=ROME), datetime(2026, 10, 25, 19, 0)),
+    ],
+)
+def test_next_reminder_across_dst(now: datetime, utc: datetime) -> None:
+    """The evening reminder keeps its local time across a DST change."""
+    schedule = schedule_of(monday="Carta")
+    fire_at, due = schedule.next_reminder(parse_reminders("-1 20:00"), now, ROME)
+    assert (fire_at.hour, fire_at.minute) == (20, 0)
+    assert fire_at.astimezone(timezone.utc) == utc.replace(tzinfo=timezone.utc)
+    assert due == [(utc.date() + timedelta(days=1), 1)]
@@ -0,0 +1,297 @@
+"""Differential tests of the schedule engine against the original lookups."""
+from datetime import date, timedelta
+import random
+
+import pytest
+
+import baseline
+from waste_manager.schedule import (
+    TypeRegistry,
+    WasteSchedule,
+    migrate_config,
+    schedule_key,
+    set_exception_record,
+    type_id,
+)
+
+TYPES = ["Plastica", "Carta", "Umido", "Vetro", "Indifferenziata", "Verde", "Sfalci Erba"]
+
+START = date(2025, 1, 1)
+YEARS = 3
+
+
+def random_config(rng: random.Random) -> dict:
+    """Return a random version 1 config (raw weekday strings and exceptions)."""
+    config = {}
+    for key in baseline.WEEK_KEYS:
+        if rng.random() < 0.4:
+            config[key] = ""
+        else:
+            config[key] = ", ".join(rng.sample(TYPES, rng.randint(1, 3)))
+
+    lines = []
+    for day, month in {
+        (rng.randint(1, 28), rng.randint(1, 12)) for _ in range(rng.randint(0, 12))
+    } | ({(29, 2)} if rng.random() < 0.3 else set()):
+        value = rng.choice([
+            "Nessuno",
+            "nessuno",
+            "",
+            ", ".join(rng.sample(TYPES, rng.randint(1, 2))),
+        ])
+        lines.append(f"{day:02d}/{month:02d}: {value}")
+    if rng.random() < 0.3:
+        lines.append("not an exception")
+    config["exceptions"] = "\n".join(lines)
+    return config
+
+
+def build(
+    config: dict, compile_from: date | None
+) -> tuple[WasteSchedule, TypeRegistry]:
+    """Return the schedule and types of a version 1 config."""
+    new = migrate_config(config)
+    schedule = WasteSchedule(new)
+    if compile_from is not None:
+        schedule.compile(compile_from)
+    return schedule, TypeRegistry(new["waste_types"])
+
+
+def next_pickup(schedule: WasteSchedule, registry: TypeRegistry, today: date):
+    """Lookup of ``WastePickupSensor.update``."""
+    upcoming = [
+        (day, registry.names(schedule.slots[slot]), (day - today).days)
+        for day, slot in schedule.iter_pickups(today, today + timedelta(days=14))
+    ]
+    if not upcoming:
+        return [], None, []
+    return upcoming[0][1], upcoming[0][2], upcoming[:5]
+
+
+def type_days_until(schedule: WasteSchedule, tid: str, today: date):
+    """Lookup of ``WasteTypeSensor.update``."""
+    bit = schedule.bit(tid)
+    for i in range(30):
+        if schedule.mask_on(today + timedelta(days=i)) & bit:
+            return i
+    return None
+
+
+# Not compiled, and windows starting before, within and after the span checked
+COMPILE_FROM = [
+    None,
+    START - timedelta(days=100),
+    START + timedelta(days=200),
+    START + timedelta(days=366 * YEARS + 30),
+]
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("compile_from", COMPILE_FROM)
+def test_matches_baseline_every_day(seed: int, compile_from: date | None) -> None:
+    """Every day of several years gives the original sensor states."""
+    rng = random.Random(seed)
+    config = random_config(rng)
+    schedule, registry = build(config, compile_from)
+    weekly = sorted(baseline.weekly_types(config))
+
+    day = START
+    end = START + timedelta(days=366 * YEARS)
+    while day < end:
+        assert next_pickup(schedule, registry, day) == (
+            baseline.next_pickup(config, day)
+        ), day
+        for name in weekly:
+            assert type_days_until(schedule, type_id(name), day) == (
+                baseline.type_days_until(config, name, day)
+            ), (day, name)
+        day += timedelta(days=1)
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("compile_from", COMPILE_FROM)
+def test_calendar_ranges_match_baseline(seed: int, compile_from: date | None) -> None:
+    """Random calendar ranges list the original events."""
+    rng = random.Random(1000 + seed)
+    config = random_config(rng)
+    schedule, registry = build(config, compile_from)
+
+    for _ in range(40):
+        start = START + timedelta(days=rng.randint(0, 366 * YEARS))
+        end = start + timedelta(days=rng.choice([0, 6, 30, 41, 365, 800]))
+        events = [
+            (day, registry.names(schedule.slots[slot]))
+            for day, slot in schedule.iter_pickups(start, end)
+        ]
+        assert events == baseline.events(config, start, end), (start, end)
+
+
+@pytest.mark.parametrize("seed", range(25))
+def test_compiled_matches_rules(seed: int) -> None:
+    """The compiled window agrees with the rules it was compiled from."""
+    rng = random.Random(2000 + seed)
+    config = random_config(rng)
+    compiled, _ = build(config, START)
+    rules, _ = build(config, None)
+
+    for i in range(len(compiled.days)):
+        day = START + timedelta(days=i)
+        assert compiled.types_on(day) == rules.types_on(day), day
+        offset = compiled.next_offsets[i]
+        following = rules.next_pickup(day, len(compiled.days) - i)
+        expected = (following - day).days if following else -1
+        assert offset == expected, day
+
+
+def assert_same_days(schedule: WasteSchedule, expected: WasteSchedule) -> None:
+    """Assert two schedules collect the same types over the compiled window."""
+    for i in range(len(schedule.days)):
+        day = schedule.start + timedelta(days=i)
+        assert schedule.types_on(day) == expected.types_on(day), day
+        assert schedule.next_pickup(day, 30) == expected.next_pickup(day, 30), day
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_compiled_round_trip(seed: int) -> None:
+    """A compiled window loads back into a fresh schedule unchanged."""
+    config = migrate_config(random_config(random.Random(3000 + seed)))
+    schedule = WasteSchedule(config)
+    schedule.compile(START)
+
+    loaded = WasteSchedule(config)
+    assert loaded.load_bytes(schedule.to_bytes())
+    assert loaded.start == START
+    assert list(loaded.days) == list(schedule.days)
+    assert list(loaded.next_offsets) == list(schedule.next_offsets)
+
+
+def test_compiled_rejects_other_revision() -> None:
+    """A window compiled from another definition is not loaded."""
+    config = migrate_config(random_config(random.Random(1)))
+    schedule = WasteSchedule(config)
+    schedule.compile(START)
+
+    other = migrate_config(random_config(random.Random(2)))
+    assert not WasteSchedule(other).load_bytes(schedule.to_bytes())
+    assert not WasteSchedule(config).load_bytes(schedule.to_bytes()[:-1])
+
+
+def test_compiled_edited_schedule_loads_into_fresh_build() -> None:
+    """An edited schedule numbers its slots differently from a fresh build."""
+    config = migrate_config({
+        "monday": "Carta",
+        "exceptions": "05/01/2027: Vetro\n06/01/2027: Plastica\n07/01/2027: Vetro",
+    })
+    schedule = WasteSchedule(config)
+    schedule.compile(date(2026, 10, 1))
+
+    # The calendar edit of 05/01/2027: patched in place, record moved last
+    edited_config = dict(config)
+    edited_config["exceptions"] = set_exception_record(
+        config["exceptions"], date(2027, 1, 5), ["plastica"]
+    )
+    edited = schedule.clone(schedule_key(edited_config))
+    edited.set_exception(date(2027, 1, 5), ["plastica"])
+
+    loaded = WasteSchedule(edited_config)
+    assert loaded.slots != edited.slots
+    assert loaded.load_bytes(edited.to_bytes())
+    assert loaded.types_on(date(2027, 1, 5)) == ("plastica",)
+    assert loaded.types_on(date(2027, 1, 6)) == ("plastica",)
+    assert loaded.types_on(date(2027, 1, 7)) == ("vetro",)
+    assert_same_days(loaded, WasteSchedule(edited_config))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_set_exception_matches_fresh_build(seed: int) -> None:
+    """Calendar edits patched in place give the schedule of a fresh build."""
+    rng = random.Random(4000 + seed)
+    config = migrate_config(random_config(rng))
+    schedule = WasteSchedule(config)
+    schedule.compile(START)
+    ids = list(schedule.type_ids)
+
+    for _ in range(30):
+        day = START + timedelta(days=rng.randint(-10, len(schedule.days) + 10))
+        types = rng.sample(ids, rng.randint(0, min(2, len(ids))))
+        config = dict(config)
+        config["exceptions"] = set_exception_record(config["exceptions"], day, types)
+        schedule = schedule.clone(schedule_key(config))
+        schedule.set_exception(day, types)
+
+        fresh = WasteSchedule(config)
+        fresh.compile(START)
+        assert schedule.types_on(day) == tuple(types)
+        assert list(schedule.next_offsets) == list(fresh.next_offsets)
+        assert_same_days(schedule, fresh)
+
+    # And the edited window survives a restart
+    loaded = WasteSchedule(config)
+    assert loaded.load_bytes(schedule.to_bytes())
+    assert_same_days(loaded, fresh)
+
+
+def test_key_ignores_how_types_look() -> None:
+    """Entries differing only in names, icons and colors share a schedule."""
+    config = migrate_config({"monday": "Carta", "thursday": "Vetro"})
+    restyled = dict(config)
+    restyled["waste_types"] = {
+        tid: {**info, "name": info["name"].upper(), "icon": "x.png", "color": "#123456"}
+        for tid, info in config["waste_types"].items()
+    }
+    assert schedule_key(restyled) == schedule_key(config)
+
+    reordered = dict(config)
+    reordered["waste_types"] = dict(reversed(config["waste_types"].items()))
+    assert schedule_key(reordered) != schedule_key(config)
+
+
+def test_type_registry() -> None:
+    """Display names and the MDI icon come from the entry's own registry."""
+    registry = TypeRegistry(
+        migrate_config({"monday": "Carta, Plastica", "friday": "Secco"})["waste_types"]
+    )
+    assert registry.names(["plastica", "secco", "unknown"]) == [
+        "Plastica", "Secco", "unknown",
+    ]
+    assert registry.mdi_icon(["carta", "plastica"]) == "mdi:recycle"
+    assert registry.mdi_icon(["carta"]) == "mdi:newspaper"
+    assert registry.mdi_icon(["secco"]) == "mdi:delete-empty"
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("compile_from", COMPILE_FROM)
+def test_query_filters_by_type(seed: int, compile_from: date | None) -> None:
+    """query() lists the pickup days of a window collecting a wanted type."""
+    rng = random.Random(5000 + seed)
+    config = random_config(rng)
+    schedule, _ = build(config, compile_from)
+    ids = schedule.type_ids
+
+    for _ in range(20):
+        start = START + timedelta(days=rng.randint(0, 366 * YEARS))
+        end = start + timedelta(days=rng.choice([0, 13, 60, 366]))
+        wanted = rng.sample(ids, rng.randint(0, min(2, len(ids))))
+        limit = rng.choice([None, 1, 3])
+
+        expected = []
+        day = start
+        while day <= end and (limit is None or len(expected) < limit):
+            types = schedule.types_on(day)
+            if types and (not wanted or set(types) & set(wanted)):
+                expected.append((day, types))
+            day += timedelta(days=1)
+        assert schedule.query(start, end, schedule.mask(wanted), limit) == expected
+
+
+def test_query_next_pickups_of_one_type() -> None:
+    """The next glass pickups, as asked by waste_manager.next_pickups."""
+    schedule, _ = build({"monday": "Carta", "thursday": "Vetro, Plastica"}, None)
+    mask = schedule.mask(["vetro"])
+    assert schedule.query(date(2026, 10, 19), date(2027, 10, 19), mask, 3) == [
+        (date(2026, 10, 22), ("vetro", "plastica")),
+        (date(2026, 10, 29), ("vetro", "plastica")),
+        (date(2026, 11, 5), ("vetro", "plastica")),
+    ]
+    # An unknown type matches nothing (the service rejects it)
+    assert schedule.mask([type_id("Plastica, Vetro")]) == 0